@@ -0,0 +1,34 @@
+import json
+import logging
+import argparse
+
+from dcg_core.archive import ContactArchiver
+from dcg_core.config import Config, load_config
+from dcg_core.logging_setup import setup_logging
+from dcg_core.profiling import run_profiled
+
+# -------------------- LOGGING SETUP -------------------- #
+setup_logging("email_campaign.log")
+logger = logging.getLogger(__name__)
+
+# -------------------- MAIN FUNCTION -------------------- #
+def main():
+    parser = argparse.ArgumentParser(description="Move cold contacts out of the working sheet")
+    parser.add_argument("--dry-run", action="store_true", help="count cold contacts without moving them")
+    parser.add_argument("--find", metavar="EMAIL", help="look a contact up in the working sheet and the archive")
+    args = parser.parse_args()
+
+    archiver = ContactArchiver(Config(), load_config().get("archive", {}))
+    if args.find:
+        contact = archiver.find(args.find)
+        print(json.dumps(contact, indent=2, ensure_ascii=False, default=str) if contact else "Not found")
+        return
+
+    try:
+        summary = archiver.run(dry_run=args.dry_run)
+    except RuntimeError as e:
+        raise SystemExit(f"Not archiving: {e}")
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    run_profiled("archive_contacts", main)
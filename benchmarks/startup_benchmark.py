@@ -0,0 +1,81 @@
+"""
+Measures the cold-start import cost of each entry point.
+
+Every module is imported in a fresh interpreter, several times, and the
+median wall-clock time is reported alongside the bare interpreter start-up
+so the numbers show what each script adds on top of Python itself.
+
+    python benchmarks/startup_benchmark.py --runs 10
+    python benchmarks/startup_benchmark.py --importtime send_scheduled_emails
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = [
+    "send_scheduled_emails",
+    "segment_updater",
+    "segment_selector",
+    "send_segment_invite",
+    "form_app",
+    "segment_invite_form",
+]
+
+def _run(code: str, workdir: str, extra_args: Optional[List[str]] = None) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, CONFIG_PATH=os.path.join(REPO_ROOT, "config.yaml"))
+    # Entry points open their log files on import; keep those out of the repo
+    return subprocess.run(
+        [sys.executable, *(extra_args or []), "-c", code],
+        cwd=workdir, env=env, capture_output=True, text=True
+    )
+
+def time_import(module: str, runs: int, workdir: str) -> Optional[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = _run(f"import {module}" if module else "pass", workdir)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            last_line = (result.stderr.strip().splitlines() or ["unknown error"])[-1]
+            print(f"  {module}: import failed ({last_line})")
+            return None
+        samples.append(elapsed * 1000)
+    return statistics.median(samples)
+
+def show_importtime(module: str, workdir: str, top: int = 15):
+    result = _run(f"import {module}", workdir, ["-X", "importtime"])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        rows.append((int(cumulative_us), int(self_us), name))
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:9.1f} ms  {self_us / 1000:7.1f} ms self  {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark entry point start-up time")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("--importtime", metavar="MODULE", help="show the slowest imports of one module")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.importtime:
+            show_importtime(args.importtime, workdir)
+            return
+
+        baseline = time_import("", args.runs, workdir)
+        print(f"{'python (baseline)':<24}{baseline:9.1f} ms")
+        for module in ENTRY_POINTS:
+            median = time_import(module, args.runs, workdir)
+            if median is not None:
+                print(f"{module:<24}{median:9.1f} ms  (+{median - baseline:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
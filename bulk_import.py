@@ -0,0 +1,44 @@
+import json
+import logging
+import argparse
+
+from dcg_core.config import Config
+from dcg_core.importer import APPEND_BATCH_SIZE, import_contacts, read_csv
+from dcg_core.logging_setup import setup_logging
+from dcg_core.outbox import get_outbox
+from dcg_core.profiling import run_profiled
+from dcg_core.sheets import SheetClient
+
+# -------------------- LOGGING SETUP -------------------- #
+setup_logging("segment_invite.log")
+logger = logging.getLogger(__name__)
+
+# -------------------- MAIN FUNCTION -------------------- #
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import leads from a CSV into the contacts sheet")
+    parser.add_argument("csv_path", help="CSV with an Email column and optional Name / Notes columns")
+    parser.add_argument("--dry-run", action="store_true", help="validate and dedupe without writing")
+    parser.add_argument("--no-welcome", action="store_true", help="don't queue welcome emails")
+    parser.add_argument("--batch-size", type=int, default=APPEND_BATCH_SIZE, help="rows per append_rows call")
+    args = parser.parse_args()
+
+    with open(args.csv_path, "r", encoding="utf-8-sig") as f:
+        contacts = read_csv(f.read())
+
+    sheet_client = SheetClient(Config())
+    if not sheet_client.sheet:
+        raise SystemExit("Google Sheets client not available")
+
+    summary = import_contacts(
+        sheet_client,
+        contacts,
+        outbox=None if args.no_welcome else get_outbox(),
+        batch_size=args.batch_size,
+        dry_run=args.dry_run
+    )
+    print(json.dumps(summary, indent=2))
+    if "error" in summary:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    run_profiled("bulk_import", main)
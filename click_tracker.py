@@ -0,0 +1,117 @@
+import json
+import logging
+import argparse
+from typing import Dict, List
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from dcg_core.config import Config, load_campaigns
+from dcg_core.locks import row_lock
+from dcg_core.logging_setup import setup_logging
+from dcg_core.profiling import run_profiled
+from dcg_core.sheets import SheetClient
+from dcg_core.tracking import ClickAggregator, ClickLog, LinkTracker
+
+# -------------------- LOGGING SETUP -------------------- #
+setup_logging("click_tracker.log")
+logger = logging.getLogger(__name__)
+
+CLICK_COLUMNS = ["Clicks", "Last_Click"]
+
+# -------------------- REDIRECT SERVER -------------------- #
+def make_handler(tracker: LinkTracker, click_log: ClickLog):
+    class ClickHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            url = tracker.verify(params)
+            if not url:
+                self.send_error(404)
+                return
+            try:
+                click_log.append(params.get("e", ""), params.get("s", ""), params.get("st", ""), url)
+            except Exception as e:
+                # Never lose the visitor because logging failed
+                logger.error(f"Failed to log click for {params.get('e', '')}: {e}")
+            self.send_response(302)
+            self.send_header("Location", url)
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return ClickHandler
+
+def serve(config: Config, host: str, port: int):
+    tracker = LinkTracker(config)
+    if not tracker.enabled:
+        raise SystemExit("Set tracking.base_url and tracking.secret in config.yaml to enable click tracking")
+    server = ThreadingHTTPServer((host, port), make_handler(tracker, ClickLog(config.click_log_path)))
+    logger.info(f"🔗 Click tracker listening on {host}:{port}")
+    server.serve_forever()
+
+# -------------------- AGGREGATION -------------------- #
+def push_totals(config: Config, changed: Dict[str, Dict]) -> int:
+    """
+    Writes click totals for the contacts present in one campaign's sheet; returns how many matched.
+    """
+    sheet_client = SheetClient(config)
+    # Row numbers must not shift (archiving) between the lookup and the write
+    with row_lock():
+        rows = {
+            str(row.get("Email", "")).strip().lower(): idx
+            for idx, row in enumerate(sheet_client.get_all_records(verify=True), start=2)
+        }
+        matched = [email for email in changed if email in rows]
+        if not matched:
+            return 0
+        columns = sheet_client.ensure_columns(CLICK_COLUMNS)
+        updates = {}
+        for email in matched:
+            updates[(rows[email], columns["Clicks"])] = changed[email]["clicks"]
+            updates[(rows[email], columns["Last_Click"])] = changed[email]["last_click"]
+        if not sheet_client.update_cells(updates):
+            raise RuntimeError(f"Failed to push click totals to '{config.sheet_name}'; the log offset was not advanced")
+    logger.info(f"Pushed click totals for {len(matched)} contacts [{config.campaign_name}]")
+    return len(matched)
+
+def aggregate(configs: List[Config], push: bool = True) -> dict:
+    # All campaigns share one redirect and click log (tracking settings are global)
+    aggregator = ClickAggregator(configs[0].click_log_path)
+    changed = aggregator.collect()
+
+    if not push:
+        return {"contacts_updated": len(changed), "by_segment_step": aggregator.step_totals()}
+
+    if changed:
+        # Clicks carry no campaign, so totals go to every campaign sheet holding the contact
+        pushed = set()
+        for config in configs:
+            sheet = (config.sheet_name, config.worksheet_name)
+            if sheet not in pushed:
+                pushed.add(sheet)
+                push_totals(config, changed)
+
+    # Only advance the log offset once the totals are safely in every sheet
+    aggregator.save()
+    return {"contacts_updated": len(changed), "by_segment_step": aggregator.step_totals()}
+
+# -------------------- MAIN FUNCTION -------------------- #
+def main():
+    parser = argparse.ArgumentParser(description="Click tracking redirect and aggregator")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="run the redirect endpoint")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    aggregate_parser = subparsers.add_parser("aggregate", help="roll up new clicks and push them to the sheet")
+    aggregate_parser.add_argument("--dry-run", action="store_true", help="report new clicks without pushing them")
+    args = parser.parse_args()
+
+    config = Config()
+    if args.command == "serve":
+        serve(config, args.host, args.port)
+    else:
+        print(json.dumps(aggregate(load_campaigns(), push=not args.dry_run), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    run_profiled("click_tracker", main)
@@ -0,0 +1,7 @@
+"""
+Shared building blocks for the DCG email campaign scripts.
+
+Submodules import their heavy dependencies (gspread, oauth2client, yaml,
+tenacity, smtplib) lazily, so importing this package is cheap and entry
+points only pay for what they actually use.
+"""
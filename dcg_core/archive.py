@@ -0,0 +1,165 @@
+import copy
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from dcg_core.dates import parse_date
+from dcg_core.funnel import CTA_LOOP, PENDING_SEGMENT, campaign_key, contact_state, get_funnel
+from dcg_core.locks import row_lock
+from dcg_core.offline import state_path
+from dcg_core.sheets import SheetClient, open_worksheet
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_STEP = "Archived"
+ARCHIVED_AT = "Archived_At"
+
+# -------------------- ARCHIVE POLICY -------------------- #
+class ArchivePolicy:
+    """
+    Decides which contacts are cold enough to leave the working sheet.
+
+    CTA Loop contacts are archived once their Next_Step_Date is
+    `cta_loop_after_days` old; contacts still pending a segment choice are
+    archived `pending_after_days` after sign-up when that is set.
+    """
+
+    def __init__(self, cfg: Dict):
+        self.cta_loop_after_days = cfg.get("cta_loop_after_days", 30)
+        self.pending_after_days = cfg.get("pending_after_days")
+
+    def is_cold(self, row: Dict, today) -> bool:
+        segment = str(row.get("Segment", "")).strip()
+        if str(row.get("Last_Email_Sent", "")).strip() == CTA_LOOP:
+            last_step = parse_date(row.get("Next_Step_Date", ""))
+            return last_step is not None and last_step <= today - timedelta(days=self.cta_loop_after_days)
+        if self.pending_after_days is not None and segment.lower() == PENDING_SEGMENT.lower():
+            signed_up = parse_date(str(row.get("Timestamp", "")).split(" ")[0])
+            return signed_up is not None and signed_up <= today - timedelta(days=int(self.pending_after_days))
+        return False
+
+# -------------------- ARCHIVE STORES -------------------- #
+class WorksheetArchive:
+    def __init__(self, config, worksheet_name: str):
+        self.config = copy.copy(config)
+        self.config.worksheet_name = worksheet_name
+        self._client: Optional[SheetClient] = None
+
+    def _sheet_client(self, headers: Optional[List[str]] = None) -> SheetClient:
+        if self._client is None:
+            if headers:
+                open_worksheet(self.config.sheet_name, self.config.worksheet_name, create_with_headers=headers)
+            self._client = SheetClient(self.config)
+        return self._client
+
+    def store(self, headers: List[str], rows: List[Dict]):
+        sheet_client = self._sheet_client(headers + [ARCHIVED_AT])
+        if not sheet_client.sheet:
+            raise RuntimeError(f"Archive worksheet '{self.config.worksheet_name}' not available")
+        sheet_client.append_rows([[row.get(h, "") for h in headers + [ARCHIVED_AT]] for row in rows])
+
+    def find(self, email: str) -> Optional[Dict]:
+        for row in self._sheet_client().get_all_records():
+            if str(row.get("Email", "")).strip().lower() == email:
+                return row
+        return None
+
+    def emails(self) -> Set[str]:
+        return {str(row.get("Email", "")).strip().lower() for row in self._sheet_client().get_all_records()}
+
+class LocalArchive:
+    # gzip members can be appended, so each run adds one compressed member
+    def __init__(self, path: str):
+        self.path = path
+
+    def store(self, headers: List[str], rows: List[Dict]):
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+
+    def find(self, email: str) -> Optional[Dict]:
+        if not os.path.exists(self.path):
+            return None
+        found = None
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                if str(row.get("Email", "")).strip().lower() == email:
+                    found = row  # keep the latest archived copy
+        return found
+
+    def emails(self) -> Set[str]:
+        if not os.path.exists(self.path):
+            return set()
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            return {str(json.loads(line).get("Email", "")).strip().lower() for line in f}
+
+def archive_store(config, archive_cfg: Dict):
+    if archive_cfg.get("worksheet"):
+        return WorksheetArchive(config, archive_cfg["worksheet"])
+    return LocalArchive(state_path(archive_cfg.get("local_path", "archive.jsonl.gz")))
+
+# -------------------- ARCHIVER -------------------- #
+class ContactArchiver:
+    def __init__(self, config, archive_cfg: Dict):
+        self.sheet_client = SheetClient(config)
+        self.policy = ArchivePolicy(archive_cfg)
+        self.store = archive_store(config, archive_cfg)
+
+    def select_cold(self) -> Tuple[List[str], List[Tuple[int, Dict]]]:
+        records = self.sheet_client.get_all_records(fresh=True)
+        headers = list(records[0].keys()) if records else []
+        today = datetime.now().date()
+        cold = [(idx, row) for idx, row in enumerate(records, start=2) if self.policy.is_cold(row, today)]
+        return headers, cold
+
+    def run(self, dry_run: bool = False) -> Dict:
+        if dry_run:
+            return {"archived": 0, "cold": len(self.select_cold()[1])}
+        # Deleting rows shifts the ones below, under any scheduler writing by cached row index
+        with row_lock(exclusive=True, wait=False):
+            return self._archive()
+
+    def _archive(self) -> Dict:
+        headers, cold = self.select_cold()
+        summary = {"archived": 0, "cold": len(cold)}
+        if not cold:
+            return summary
+
+        # Rows are deleted by position, so make sure nothing moved since we looked
+        current = self.sheet_client.get_all_records(fresh=True)
+        for idx, row in cold:
+            if idx - 2 >= len(current) or current[idx - 2].get("Email") != row.get("Email"):
+                raise RuntimeError("Sheet changed while archiving; nothing was moved, try again")
+
+        archived_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [dict(row, **{ARCHIVED_AT: archived_at}) for _, row in cold]
+        self.store.store(headers, rows)
+        self.sheet_client.delete_rows([idx for idx, _ in cold])
+
+        funnel = get_funnel()
+        moves: Dict[Tuple, int] = {}
+        for _, row in cold:
+            state = contact_state(row.get("Segment", ""), row.get("Last_Email_Sent", ""))
+            if state:
+                moves[state] = moves.get(state, 0) + 1
+        for state, count in moves.items():
+            funnel.record(campaign_key(self.sheet_client.config), state, (state[0], ARCHIVED_STEP), count=count)
+
+        summary["archived"] = len(cold)
+        logger.info(f"Archived {len(cold)} cold contacts out of the working sheet")
+        return summary
+
+    def find(self, email: str) -> Optional[Dict]:
+        """
+        Looks a contact up in the working sheet first, then in the archive.
+        """
+        email = email.strip().lower()
+        for row in self.sheet_client.get_all_records():
+            if str(row.get("Email", "")).strip().lower() == email:
+                return dict(row, Location="working sheet")
+        archived = self.store.find(email)
+        return dict(archived, Location="archive") if archived else None
@@ -0,0 +1,88 @@
+import os
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from dcg_core.offline import state_path
+from dcg_core.sender_pool import load_senders
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = "config.yaml"
+
+# -------------------- RAW CONFIG -------------------- #
+@lru_cache(maxsize=None)
+def _read_config(config_path: str) -> Dict:
+    import yaml
+
+    with open(config_path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+def load_config(config_path: Optional[str] = None) -> Dict:
+    """
+    Returns the parsed config.yaml. The file is read and parsed once per process.
+    """
+    return _read_config(config_path or os.getenv("CONFIG_PATH", DEFAULT_CONFIG_PATH))
+
+# -------------------- CONFIGURATION -------------------- #
+class Config:
+    def __init__(self, config_path: Optional[str] = None, campaign: Optional[Dict] = None):
+        try:
+            cfg = load_config(config_path)
+            email_cfg = cfg.get("email", {})
+            app_cfg = cfg.get("app", {})
+
+            self.sheet_name = cfg["sheets"]["name"]
+            self.worksheet_name = cfg["sheets"]["worksheet"]
+            self.read_ttl = cfg["sheets"].get("read_ttl", 5)
+            self.write_batch_size = cfg["sheets"].get("write_batch_size", 100)
+            self.write_max_delay = cfg["sheets"].get("write_max_delay", 5)
+            self.snapshot_max_age = cfg["sheets"].get("snapshot_max_age", 3600)
+
+            self.sender_email = email_cfg["sender_email"]
+            self.app_password = email_cfg["app_password"]
+            self.senders = load_senders(cfg)
+            self.email_sequence_folder = email_cfg["sequence_folder"]
+            self.retry_attempts = email_cfg.get("retry_attempts", 3)
+            self.retry_delay = email_cfg.get("retry_delay", 5)
+            self.send_budget = email_cfg.get("send_budget")
+            self.backlog_per_run = email_cfg.get("backlog_per_run", 200)
+
+            tracking_cfg = cfg.get("tracking", {})
+            self.tracking_base_url = tracking_cfg.get("base_url", "")
+            self.tracking_secret = tracking_cfg.get("secret", "")
+            self.click_log_path = state_path(tracking_cfg.get("log_path", "clicks.log"))
+
+            self.page_title = app_cfg.get("page_title", "Tell Us What You're Interested In")
+            self.segments = app_cfg.get("segments", [])
+
+            self.campaign_name = "default"
+            self.campaign_budget = None
+            if campaign:
+                self._apply_campaign(campaign, email_cfg)
+        except Exception as e:
+            logger.error(f"Failed to load configuration: {e}")
+            raise
+
+    def _apply_campaign(self, campaign: Dict, email_cfg: Dict):
+        # A campaign overrides the sheet, sequences and senders of the base config
+        self.campaign_name = campaign["name"]
+        self.sheet_name = campaign.get("sheet", self.sheet_name)
+        self.worksheet_name = campaign.get("worksheet", self.worksheet_name)
+        self.email_sequence_folder = campaign.get("sequence_folder", self.email_sequence_folder)
+        self.backlog_per_run = campaign.get("backlog_per_run", self.backlog_per_run)
+        self.campaign_budget = campaign.get("send_budget")
+        if "senders" in campaign or "sender_email" in campaign:
+            campaign_email = dict(campaign)
+            if "daily_limit" in email_cfg:
+                campaign_email.setdefault("daily_limit", email_cfg["daily_limit"])
+            self.senders = load_senders({"email": campaign_email})
+
+def load_campaigns(config_path: Optional[str] = None) -> List[Config]:
+    """
+    Returns one Config per entry under `campaigns`, or the base config when none are listed.
+    """
+    campaigns = load_config(config_path).get("campaigns") or []
+    if not campaigns:
+        return [Config(config_path)]
+    return [Config(config_path, campaign) for campaign in campaigns]
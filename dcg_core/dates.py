@@ -0,0 +1,20 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", "%m/%d/%y", "%Y-%m-%d %H:%M:%S", "%B %d, %Y", "%b %d, %Y")
+SHEETS_EPOCH = date(1899, 12, 30)
+
+# -------------------- DATE PARSING -------------------- #
+def parse_date(value) -> Optional[date]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Unformatted date cells come back as serial day numbers
+        return SHEETS_EPOCH + timedelta(days=int(value))
+    value = str(value or "").strip()
+    if not value:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
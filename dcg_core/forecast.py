@@ -0,0 +1,224 @@
+import csv
+import math
+import logging
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dcg_core.dates import parse_date
+from dcg_core.funnel import CTA_LOOP, PENDING_SEGMENT
+from dcg_core.sender_pool import SenderPool
+from dcg_core.sequences import EmailSequenceManager
+
+logger = logging.getLogger(__name__)
+
+STEP_INTERVAL = timedelta(days=7)  # matches the Next_Step_Date bump in CampaignManager
+REQUESTS_PER_RUN = 4               # open + worksheet + revision check + get_all_records per campaign
+CELLS_PER_SEND = 2                 # Last_Email_Sent + Next_Step_Date
+SECONDS_PER_SEND = 1.0             # typical Gmail SMTP round trip per message
+
+Bucket = Tuple[date, str, int]     # (due date, segment, index of the next sequence email)
+
+def step_index(last_email: str) -> Optional[int]:
+    """
+    Index of the next email to send, as CampaignManager._get_email_index works it out; None once in the CTA Loop.
+    """
+    last_email = str(last_email or "").strip()
+    if last_email == CTA_LOOP:
+        return None
+    if last_email.startswith("Week"):
+        try:
+            return int(last_email.replace("Week ", ""))
+        except ValueError:
+            return 0
+    return 0
+
+def read_snapshot(path: str) -> Iterable[Dict]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+def _fair_share(demands: List[int], budget: int) -> List[int]:
+    # Same outcome as the scheduler's round-robin: small campaigns are filled
+    # first and whatever they leave is split evenly among the rest.
+    shares = [0] * len(demands)
+    remaining = max(budget, 0)
+    order = sorted(range(len(demands)), key=lambda i: demands[i])
+    for left, i in zip(range(len(order), 0, -1), order):
+        shares[i] = min(demands[i], math.ceil(remaining / left))
+        remaining -= shares[i]
+    return shares
+
+# -------------------- CAMPAIGN STATE -------------------- #
+class CampaignBuckets:
+    """
+    Contacts of one campaign collapsed into counts per (due date, segment, step).
+
+    Contacts that will never be sent (CTA Loop, pending segment, missing
+    sequence) are left out, as the scheduler leaves them out of its due list.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.sequences = EmailSequenceManager(config)
+        self.pool = SenderPool(config.senders)
+        self.buckets: Dict[Bucket, int] = {}
+        self.skipped = 0
+
+    def add_rows(self, rows: Iterable[Dict]):
+        dates: Dict[str, Optional[date]] = {}  # the same few dates repeat across many rows
+        lengths: Dict[str, int] = {}
+        for row in rows:
+            raw_date = str(row.get("Next_Step_Date", "")).strip()
+            if not raw_date:
+                continue
+            if raw_date not in dates:
+                dates[raw_date] = parse_date(int(raw_date) if raw_date.isdigit() else raw_date)
+            due = dates[raw_date]
+            if due is None:
+                self.skipped += 1
+                continue
+
+            segment = str(row.get("Segment", "")).strip()
+            if segment not in lengths:
+                valid = segment and segment != PENDING_SEGMENT
+                lengths[segment] = len(self.sequences.load_sequence(segment)) if valid else 0
+            index = step_index(row.get("Last_Email_Sent", ""))
+            if not str(row.get("Email", "")).strip() or not lengths[segment] or index is None:
+                continue
+            key = (due, segment, index)
+            self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def due_on(self, day: date) -> List[Tuple[Bucket, int]]:
+        return sorted((key, count) for key, count in self.buckets.items() if key[0] <= day)
+
+    def eligible(self, due: List[Tuple[Bucket, int]], day: date, capacity: int) -> int:
+        overdue = sum(count for key, count in due if key[0] < day)
+        on_time = sum(count for key, count in due if key[0] == day)
+        eligible = min(overdue, self.config.backlog_per_run) + on_time
+        if self.config.campaign_budget is not None:
+            eligible = min(eligible, int(self.config.campaign_budget))
+        return min(eligible, capacity)
+
+    def send(self, due: List[Tuple[Bucket, int]], day: date, allowed: int) -> Dict[str, int]:
+        """
+        Advances the oldest `allowed` eligible contacts one step; returns sends per segment.
+        """
+        sent: Dict[str, int] = {}
+        backlog = self.config.backlog_per_run
+        for key, count in due:
+            if allowed <= 0:
+                break
+            due_date, segment, index = key
+            take = min(count, allowed)
+            if due_date < day:
+                take = min(take, backlog)
+                backlog -= take
+            if not take:
+                continue
+            allowed -= take
+            sent[segment] = sent.get(segment, 0) + take
+
+            self.buckets[key] -= take
+            if not self.buckets[key]:
+                del self.buckets[key]
+            next_due = day + STEP_INTERVAL
+            # After the CTA the contact parks in the CTA Loop for good
+            if index < len(self.sequences.load_sequence(segment)):
+                next_key = (next_due, segment, index + 1)
+                self.buckets[next_key] = self.buckets.get(next_key, 0) + take
+        return sent
+
+# -------------------- FORECASTER -------------------- #
+class SendForecaster:
+    """
+    Replays the daily scheduler run over bucketed contact state.
+
+    Each simulated day applies the same limits as CampaignScheduler: the
+    sender accounts' daily limits, `email.send_budget`, per-campaign budgets,
+    `backlog_per_run` and the outbox's share of the budget.
+
+    Sheets requests assume sends go out one after another at `seconds_per_send`:
+    while a campaign has writes pending, its buffer is flushed every
+    `write_max_delay` seconds or every `write_batch_size` cells, whichever comes first.
+    """
+
+    def __init__(self, campaigns: List[CampaignBuckets], send_budget: Optional[int] = None,
+                 outbox_pending: int = 0, requests_per_minute: int = 60,
+                 seconds_per_send: float = SECONDS_PER_SEND):
+        self.campaigns = campaigns
+        self.send_budget = send_budget
+        self.outbox_pending = outbox_pending
+        self.requests_per_minute = requests_per_minute
+        self.seconds_per_send = seconds_per_send
+
+    def assumptions(self) -> Dict:
+        return {
+            "seconds_per_send": self.seconds_per_send,
+            "requests_per_run": REQUESTS_PER_RUN,
+            "cells_per_send": CELLS_PER_SEND,
+            "requests_per_minute": self.requests_per_minute,
+        }
+
+    def run(self, days: int, start: Optional[date] = None) -> List[Dict]:
+        today = date.today()
+        start = start or today
+        accounts = {a.sender_email: a for c in self.campaigns for a in c.pool.accounts}
+        report = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            # Only today's run sees what was already sent today
+            if day == today:
+                capacity = sum(a.remaining for a in accounts.values())
+                pool_capacity = [c.pool.remaining for c in self.campaigns]
+            else:
+                capacity = sum(a.daily_limit for a in accounts.values())
+                pool_capacity = [sum(a.daily_limit for a in c.pool.accounts) for c in self.campaigns]
+            report.append(self._simulate_day(day, capacity, pool_capacity))
+        return report
+
+    def _simulate_day(self, day: date, capacity: int, pool_capacity: List[int]) -> Dict:
+        budget = capacity if self.send_budget is None else min(capacity, int(self.send_budget))
+        due = [c.due_on(day) for c in self.campaigns]
+        total_due = sum(count for d in due for _, count in d)
+
+        outbox = min(self.outbox_pending, max(budget - min(total_due, budget // 2), 0))
+        self.outbox_pending -= outbox
+        budget -= outbox
+
+        demands = [c.eligible(d, day, cap) for c, d, cap in zip(self.campaigns, due, pool_capacity)]
+        sent_by_segment: Dict[str, int] = {}
+        campaign_sends = []
+        for campaign, d, share in zip(self.campaigns, due, _fair_share(demands, budget)):
+            sent = campaign.send(d, day, share)
+            for segment, count in sent.items():
+                sent_by_segment[segment] = sent_by_segment.get(segment, 0) + count
+            campaign_sends.append(sum(sent.values()))
+
+        sends = sum(sent_by_segment.values())
+        # Campaigns are served round-robin, so each one's buffer stays open for the whole run
+        send_seconds = (sends + outbox) * self.seconds_per_send
+        requests = cells = flushes = 0
+        for campaign, sent in zip(self.campaigns, campaign_sends):
+            campaign_cells = CELLS_PER_SEND * sent
+            campaign_flushes = min(sent, max(
+                math.ceil(campaign_cells / campaign.config.write_batch_size),
+                math.ceil(send_seconds / max(campaign.config.write_max_delay, 1)),
+            ))
+            cells += campaign_cells
+            flushes += campaign_flushes
+            requests += REQUESTS_PER_RUN + campaign_flushes
+
+        return {
+            "date": day.isoformat(),
+            "due": total_due,
+            "sends": sends,
+            "outbox": outbox,
+            "deferred": total_due - sends,
+            "gmail_capacity": capacity,
+            "gmail_headroom": capacity - sends - outbox,
+            "sheet_cells": cells,
+            "sheet_flushes": flushes,
+            "send_minutes": round(send_seconds / 60, 1),
+            "sheets_requests": requests,
+            "sheets_minutes": round(requests / self.requests_per_minute, 2),
+            "by_segment": sent_by_segment,
+        }
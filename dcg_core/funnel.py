@@ -0,0 +1,169 @@
+import os
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dcg_core.offline import state_path
+
+logger = logging.getLogger(__name__)
+
+FUNNEL_PATH = os.getenv("FUNNEL_STATS_PATH", "funnel_stats.db")
+PENDING_SEGMENT = "Pending Segment Selection"
+PENDING_STEP = "Pending"
+NOT_STARTED = "Not Started"
+CTA_LOOP = "CTA Loop"
+
+State = Tuple[str, str]
+
+def contact_state(segment: str, last_email: str) -> Optional[State]:
+    """
+    Maps a contact's Segment / Last_Email_Sent cells to its (segment, step) funnel position.
+    """
+    segment = str(segment or "").strip()
+    if not segment:
+        return None
+    if segment.lower() == PENDING_SEGMENT.lower():
+        return (PENDING_SEGMENT, PENDING_STEP)
+    return (segment, str(last_email or "").strip() or NOT_STARTED)
+
+def campaign_key(config) -> str:
+    """
+    Funnel counters are kept per contact list, so the forms (base config) and a
+    campaign pointing at the same sheet update the same counters.
+    """
+    return f"{config.sheet_name}/{config.worksheet_name}"
+
+# -------------------- FUNNEL STATS -------------------- #
+class FunnelStats:
+    """
+    Running contact counts per campaign and (segment, step), updated on every state change.
+
+    Counters live in a local SQLite file so the scheduler, the forms and the
+    report CLI can all update and read them without scanning the sheet.
+    A campaign's transitions are only counted once a rebuild has seeded its
+    counters from the sheet; before that they would drift below zero.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or state_path(FUNNEL_PATH)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(funnel)")]
+        if columns and "campaign" not in columns:
+            # Counters from before campaigns were tracked can't be split; reseed them
+            with self._conn:
+                self._conn.execute("DROP TABLE funnel")
+                self._conn.execute("DELETE FROM meta WHERE key LIKE 'rebuilt_at%'")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS funnel (
+                campaign TEXT NOT NULL,
+                segment TEXT NOT NULL,
+                step TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (campaign, segment, step)
+            );
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self._seeded = set()
+
+    def is_seeded(self, campaign: str) -> bool:
+        if campaign not in self._seeded:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT 1 FROM meta WHERE key = ?", (f"rebuilt_at:{campaign}",)
+                ).fetchone()
+            if row:
+                self._seeded.add(campaign)
+        return campaign in self._seeded
+
+    def record(self, campaign: str, before: Optional[State], after: Optional[State], count: int = 1):
+        if before == after or not count or not self.is_seeded(campaign):
+            return
+        try:
+            with self._lock, self._conn:
+                if before:
+                    self._add(campaign, before, -count)
+                if after:
+                    self._add(campaign, after, count)
+                self._touch()
+        except Exception as e:
+            # Stats are advisory; never let them break a send
+            logger.warning(f"Failed to record funnel transition {before} -> {after}: {e}")
+
+    def rebuild(self, campaign: str, records: Iterable[Dict]):
+        totals: Dict[State, int] = {}
+        for row in records:
+            state = contact_state(row.get("Segment", ""), row.get("Last_Email_Sent", ""))
+            if state:
+                totals[state] = totals.get(state, 0) + 1
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM funnel WHERE campaign = ?", (campaign,))
+            self._conn.executemany(
+                "INSERT INTO funnel (campaign, segment, step, count) VALUES (?, ?, ?, ?)",
+                [(campaign, segment, step, count) for (segment, step), count in totals.items()]
+            )
+            self._touch()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (f"rebuilt_at:{campaign}", datetime.now().isoformat(timespec="seconds"))
+            )
+        self._seeded.add(campaign)
+        logger.info(f"Rebuilt funnel stats for {campaign} from {sum(totals.values())} contacts")
+
+    def counts(self, campaigns: Optional[List[str]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Counts per segment and step, summed over `campaigns` (all of them when None).
+        """
+        query = "SELECT segment, step, SUM(count) FROM funnel"
+        params: List[str] = []
+        if campaigns is not None:
+            query += f" WHERE campaign IN ({', '.join('?' * len(campaigns))})"
+            params = list(campaigns)
+        query += " GROUP BY segment, step HAVING SUM(count) != 0 ORDER BY segment, step"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        counts: Dict[str, Dict[str, int]] = {}
+        for segment, step, count in rows:
+            counts.setdefault(segment, {})[step] = count
+        return counts
+
+    def report(self, campaigns: Optional[List[str]] = None) -> Dict:
+        counts = self.counts(campaigns)
+        with self._lock:
+            updated = self._conn.execute("SELECT value FROM meta WHERE key = 'updated_at'").fetchone()
+        segments = {
+            segment: {"total": sum(steps.values()), "steps": steps}
+            for segment, steps in counts.items()
+        }
+        return {
+            "updated_at": updated[0] if updated else None,
+            "contacts": sum(s["total"] for s in segments.values()),
+            "pending_selection": counts.get(PENDING_SEGMENT, {}).get(PENDING_STEP, 0),
+            "cta_loop": sum(steps.get(CTA_LOOP, 0) for steps in counts.values()),
+            "segments": segments,
+        }
+
+    def _add(self, campaign: str, state: State, delta: int):
+        self._conn.execute(
+            "INSERT INTO funnel (campaign, segment, step, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(campaign, segment, step) DO UPDATE SET count = count + excluded.count",
+            (campaign, state[0], state[1], delta)
+        )
+
+    def _touch(self):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('updated_at', ?)",
+            (datetime.now().isoformat(timespec="seconds"),)
+        )
+
+_funnel: Optional[FunnelStats] = None
+_funnel_lock = threading.Lock()
+
+def get_funnel() -> FunnelStats:
+    global _funnel
+    with _funnel_lock:
+        if _funnel is None:
+            _funnel = FunnelStats()
+        return _funnel
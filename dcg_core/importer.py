@@ -0,0 +1,132 @@
+import csv
+import io
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from dcg_core.archive import archive_store
+from dcg_core.config import load_config
+from dcg_core.funnel import PENDING_SEGMENT, PENDING_STEP, campaign_key, get_funnel
+from dcg_core.tracking import LinkTracker
+from dcg_core.validation import is_valid_email, normalize
+from dcg_core.welcome import build_welcome_email
+
+logger = logging.getLogger(__name__)
+
+APPEND_BATCH_SIZE = 5000
+NAME_COLUMNS = ("name", "full name", "full_name", "first name", "first_name")
+EMAIL_COLUMNS = ("email", "email address", "email_address", "e-mail")
+NOTES_COLUMNS = ("notes", "note")
+
+# -------------------- CSV PARSING -------------------- #
+def read_csv(text: str) -> List[Dict]:
+    """
+    Parses an uploaded CSV into {name, email, notes} dicts, matching common header spellings.
+    """
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))
+    headers = {normalize(h): h for h in (reader.fieldnames or [])}
+
+    def column(candidates) -> Optional[str]:
+        return next((headers[c] for c in candidates if c in headers), None)
+
+    name_col, email_col, notes_col = column(NAME_COLUMNS), column(EMAIL_COLUMNS), column(NOTES_COLUMNS)
+    if not email_col:
+        raise ValueError("CSV needs an Email column")
+    return [
+        {
+            "name": (row.get(name_col) or "").strip() if name_col else "",
+            "email": (row.get(email_col) or "").strip(),
+            "notes": (row.get(notes_col) or "").strip() if notes_col else "",
+        }
+        for row in reader
+    ]
+
+# -------------------- IMPORT PLAN -------------------- #
+def plan_import(contacts: Iterable[Dict], existing_records: Iterable[Dict],
+                archived_emails: Optional[Set[str]] = None) -> Dict:
+    """
+    Validates and dedupes contacts against each other, the sheet and the archive in one pass.
+    """
+    seen = {normalize(str(row.get("Email", ""))) for row in existing_records}
+    archived = archived_emails or set()
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    plan = {"rows": [], "contacts": [], "invalid": [], "duplicates": 0, "archived": 0}
+
+    for contact in contacts:
+        email = normalize(contact["email"])
+        if not is_valid_email(email):
+            plan["invalid"].append(contact["email"])
+            continue
+        if email in seen:
+            plan["duplicates"] += 1
+            continue
+        if email in archived:
+            # Archived contacts already had their sequence; don't restart them as Pending
+            plan["archived"] += 1
+            continue
+        seen.add(email)
+        name = contact.get("name", "")
+        plan["contacts"].append({"name": name, "email": email})
+        plan["rows"].append([
+            name,
+            email,
+            PENDING_SEGMENT,  # Segment not yet selected
+            "", "",           # Last_Email_Sent, Next_Step_Date
+            timestamp,
+            contact.get("notes", "")
+        ])
+    return plan
+
+# -------------------- BULK IMPORT -------------------- #
+def _welcome_messages(contacts: List[Dict], tracker: LinkTracker) -> List[Dict]:
+    messages = []
+    for contact in contacts:
+        subject, body = build_welcome_email(contact["name"] or "there", contact["email"], tracker)
+        messages.append({
+            "dedupe_key": f"welcome:{contact['email']}",
+            "recipient": contact["email"],
+            "subject": subject,
+            "body": body,
+        })
+    return messages
+
+def import_contacts(sheet_client, contacts: Iterable[Dict], outbox=None,
+                    batch_size: int = APPEND_BATCH_SIZE, dry_run: bool = False) -> Dict:
+    """
+    Appends new contacts in large append_rows batches and queues their welcome emails in `outbox`.
+    """
+    # Dedupe against the live sheet, not a cached copy another process may have outdated
+    archived = archive_store(sheet_client.config, load_config().get("archive", {})).emails()
+    plan = plan_import(contacts, sheet_client.get_all_records(fresh=True), archived)
+    rows = plan["rows"]
+    summary = {
+        "added": 0,
+        "queued": 0,
+        "duplicates": plan["duplicates"],
+        "archived": plan["archived"],
+        "invalid": len(plan["invalid"]),
+        "invalid_emails": plan["invalid"][:20],
+    }
+    if dry_run or not rows:
+        summary["would_add"] = len(rows)
+        return summary
+
+    tracker = LinkTracker(sheet_client.config)
+    for start in range(0, len(rows), batch_size):
+        # Welcome emails are queued per landed batch: a re-run sees these
+        # rows as duplicates, so it would never queue them itself
+        try:
+            sheet_client.append_rows(rows[start:start + batch_size])
+        except Exception as e:
+            logger.error(f"Bulk import stopped after {summary['added']} rows: {e}")
+            summary["error"] = str(e)
+            break
+        batch = plan["contacts"][start:start + batch_size]
+        summary["added"] += len(batch)
+        get_funnel().record(campaign_key(sheet_client.config), None, (PENDING_SEGMENT, PENDING_STEP), count=len(batch))
+        if outbox is not None:
+            summary["queued"] += outbox.enqueue_many(_welcome_messages(batch, tracker))
+
+    logger.info(f"Bulk import: {summary['added']} added, {summary['queued']} welcome emails queued, "
+                f"{summary['duplicates']} duplicates, {summary['archived']} archived, {summary['invalid']} invalid")
+    return summary
@@ -0,0 +1,146 @@
+import os
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from dcg_core.offline import state_path
+
+logger = logging.getLogger(__name__)
+
+JOBS_PATH = os.getenv("JOBS_PATH", "jobs.db")
+ACTIVE_STATUSES = ("queued", "running", "done")
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+# -------------------- JOB QUEUE -------------------- #
+class JobQueue:
+    """
+    Durable local job queue backed by SQLite.
+
+    Jobs carry a dedupe key: submitting the same key again while a job is
+    queued, running or done returns the existing job instead of a new one.
+    Only failed jobs are re-queued on resubmission.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or state_path(JOBS_PATH)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                dedupe_key TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+        """)
+
+    def submit(self, kind: str, payload: Dict, dedupe_key: str) -> int:
+        with self._lock, self._conn:
+            existing = self._conn.execute(
+                "SELECT id, status FROM jobs WHERE dedupe_key = ?", (dedupe_key,)
+            ).fetchone()
+            if existing and existing[1] in ACTIVE_STATUSES:
+                return existing[0]
+            if existing:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = NULL, payload = ?, updated_at = ? WHERE id = ?",
+                    (json.dumps(payload), _now(), existing[0])
+                )
+                job_id = existing[0]
+            else:
+                job_id = self._conn.execute(
+                    "INSERT INTO jobs (kind, dedupe_key, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (kind, dedupe_key, json.dumps(payload), _now(), _now())
+                ).lastrowid
+        self._wakeup.set()
+        return job_id
+
+    def status(self, job_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, status, error, updated_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return dict(zip(("id", "kind", "status", "error", "updated_at"), row))
+
+    def claim(self) -> Optional[Dict]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id, kind, payload FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if not row:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (_now(), row[0])
+            )
+        return {"id": row[0], "kind": row[1], "payload": json.loads(row[2])}
+
+    def finish(self, job_id: int, error: Optional[str] = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                ("failed" if error else "done", error, _now(), job_id)
+            )
+
+    def requeue_interrupted(self) -> int:
+        # Jobs left 'running' by a process that died are picked up again
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running'", (_now(),)
+            ).rowcount
+
+    def wait_for_work(self, timeout: float):
+        self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+# -------------------- JOB WORKER -------------------- #
+class JobWorker(threading.Thread):
+    """
+    Background thread that runs queued jobs through per-kind handlers.
+
+    A handler returns True on success; returning False or raising marks the
+    job failed with a message the UI can show.
+    """
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, Callable[[Dict], bool]], poll_interval: float = 2.0):
+        super().__init__(name="job-worker", daemon=True)
+        self.queue = queue
+        self.handlers = handlers
+        self.poll_interval = poll_interval
+
+    def run(self):
+        requeued = self.queue.requeue_interrupted()
+        if requeued:
+            logger.info(f"Re-queued {requeued} interrupted jobs")
+        while True:
+            job = self.queue.claim()
+            if job is None:
+                self.queue.wait_for_work(self.poll_interval)
+                continue
+            self._run_job(job)
+
+    def _run_job(self, job: Dict):
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            self.queue.finish(job["id"], f"No handler for job kind '{job['kind']}'")
+            return
+        try:
+            ok = handler(job["payload"])
+            self.queue.finish(job["id"], None if ok else "Job handler reported failure")
+        except Exception as e:
+            logger.error(f"Job {job['id']} ({job['kind']}) failed: {e}")
+            self.queue.finish(job["id"], str(e))
@@ -0,0 +1,35 @@
+import os
+import logging
+from contextlib import contextmanager
+
+from dcg_core.offline import state_path
+
+logger = logging.getLogger(__name__)
+
+ROW_LOCK_PATH = os.getenv("ROW_LOCK_PATH", "sheet_rows.lock")
+
+@contextmanager
+def row_lock(exclusive: bool = False, wait: bool = True):
+    """
+    Keeps row numbers stable across processes.
+
+    Anything that writes to a row by an index it looked up (the scheduler,
+    the forms, the click aggregator) holds the lock shared, so they can run
+    side by side; the archiver, which deletes and so shifts rows, holds it
+    exclusive. With wait=False a RuntimeError is raised instead of blocking.
+    """
+    try:
+        import fcntl
+    except ImportError:  # Windows: no cross-process lock, runs must be scheduled apart
+        yield
+        return
+    mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+    with open(state_path(ROW_LOCK_PATH), "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, mode | (0 if wait else fcntl.LOCK_NB))
+        except BlockingIOError:
+            raise RuntimeError("Sheet rows are in use (scheduler, forms or click aggregation); try again shortly")
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
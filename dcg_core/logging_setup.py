@@ -0,0 +1,14 @@
+import logging
+
+# -------------------- LOGGING SETUP -------------------- #
+def setup_logging(log_file: str):
+    # basicConfig is a no-op once the root logger has handlers, so the first
+    # entry point imported in a process decides where logs go.
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[
+            logging.FileHandler(log_file),
+            logging.StreamHandler()
+        ]
+    )
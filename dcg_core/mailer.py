@@ -0,0 +1,39 @@
+import logging
+from typing import Optional
+
+from dcg_core.sender_pool import REJECTED, SENT, SenderPool
+from dcg_core.validation import is_valid_email
+
+logger = logging.getLogger(__name__)
+
+# -------------------- EMAIL SENDER -------------------- #
+class EmailSender:
+    def __init__(self, config, pool: Optional[SenderPool] = None):
+        self.config = config
+        self.pool = pool or SenderPool(config.senders)
+
+    def send_email(self, subject: str, body: str, recipient_email: str, subtype: str = "plain") -> bool:
+        return self.deliver_email(subject, body, recipient_email, subtype) == SENT
+
+    def deliver_email(self, subject: str, body: str, recipient_email: str, subtype: str = "plain") -> str:
+        """
+        Like send_email, but returns the pool's SENT / REJECTED / UNAVAILABLE outcome.
+        """
+        from email.message import EmailMessage
+
+        if not is_valid_email(recipient_email):
+            logger.warning(f"Invalid email address: {recipient_email}")
+            return REJECTED
+
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["To"] = recipient_email
+        msg.set_content(body, subtype=subtype)
+
+        outcome = self.pool.deliver(msg, recipient_email)
+        if outcome == SENT:
+            logger.info(f"Successfully sent email to {recipient_email} from {msg['From']}: {subject}")
+        return outcome
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,218 @@
+import os
+import re
+import csv
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+OFFLINE_ENV = "DCG_OFFLINE"
+LATENCY_ENV = "DCG_OFFLINE_LATENCY"
+STATE_DIR = "state"
+A1_PATTERN = re.compile(r"^([A-Z]+)(\d+)$")
+
+def offline_path() -> Optional[str]:
+    """
+    Directory of CSV snapshots to run against instead of Google Sheets and Gmail.
+
+    Each worksheet is read from `<worksheet_name>.csv`; writes and sends stay
+    in memory, so the snapshot can be replayed as often as needed.
+    """
+    return os.getenv(OFFLINE_ENV) or None
+
+def state_path(path: str) -> str:
+    """
+    Where a local state file (outbox, funnel counters, sender usage, ...) lives.
+
+    Offline runs keep theirs under `<DCG_OFFLINE>/state/`, so replaying a
+    snapshot never touches the real queues and counters.
+    """
+    directory = offline_path()
+    if not directory:
+        return path
+    os.makedirs(os.path.join(directory, STATE_DIR), exist_ok=True)
+    return os.path.join(directory, STATE_DIR, os.path.basename(os.path.normpath(path)))
+
+def _simulate_latency():
+    # Optional fixed delay per call so profiles show realistic I/O wait
+    latency = float(os.getenv(LATENCY_ENV, "0") or 0)
+    if latency > 0:
+        time.sleep(latency)
+
+def _numericise(value: str):
+    # Mirrors gspread's get_all_records, which returns numbers for numeric cells
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+def _parse_a1(label: str):
+    match = A1_PATTERN.match(label.upper())
+    if not match:
+        raise ValueError(f"Unsupported range '{label}' in offline mode")
+    col = 0
+    for char in match.group(1):
+        col = col * 26 + ord(char) - 64
+    return int(match.group(2)), col
+
+class WorksheetNotFound(Exception):
+    # Same name as gspread's exception, which open_worksheet checks by name
+    pass
+
+# -------------------- OFFLINE WORKSHEET -------------------- #
+class OfflineWorksheet:
+    def __init__(self, spreadsheet: "OfflineSpreadsheet", title: str, rows: List[List[str]], sheet_id: int):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self._rows = rows
+        self._lock = threading.Lock()
+
+    @property
+    def col_count(self) -> int:
+        return max((len(row) for row in self._rows), default=0)
+
+    def get_all_records(self) -> List[Dict]:
+        _simulate_latency()
+        with self._lock:
+            if not self._rows:
+                return []
+            headers = self._rows[0]
+            return [
+                {h: _numericise(row[i]) if i < len(row) else "" for i, h in enumerate(headers)}
+                for row in self._rows[1:]
+            ]
+
+    def row_values(self, row: int) -> List[str]:
+        _simulate_latency()
+        with self._lock:
+            values = list(self._rows[row - 1]) if row <= len(self._rows) else []
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def add_cols(self, count: int):
+        _simulate_latency()
+        self.spreadsheet.touch()
+        with self._lock:
+            for row in self._rows:
+                row.extend([""] * count)
+
+    def batch_update(self, data: List[Dict], **kwargs):
+        _simulate_latency()
+        self.spreadsheet.touch()
+        with self._lock:
+            for update in data:
+                row, col = _parse_a1(update["range"])
+                self._set(row, col, str(update["values"][0][0]))
+
+    def update_cell(self, row: int, col: int, value):
+        _simulate_latency()
+        self.spreadsheet.touch()
+        with self._lock:
+            self._set(row, col, str(value))
+
+    def append_row(self, values: List):
+        self.append_rows([values])
+
+    def append_rows(self, rows: List[List]):
+        _simulate_latency()
+        self.spreadsheet.touch()
+        with self._lock:
+            self._rows.extend([str(v) for v in row] for row in rows)
+
+    def _delete(self, start: int, end: int):
+        self.spreadsheet.touch()
+        with self._lock:
+            del self._rows[start:end]
+
+    def _set(self, row: int, col: int, value: str):
+        while len(self._rows) < row:
+            self._rows.append([])
+        cells = self._rows[row - 1]
+        if len(cells) < col:
+            cells.extend([""] * (col - len(cells)))
+        cells[col - 1] = value
+
+# -------------------- OFFLINE SPREADSHEET -------------------- #
+class OfflineSpreadsheet:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._worksheets: Dict[str, OfflineWorksheet] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+
+    @property
+    def lastUpdateTime(self) -> str:
+        # Stands in for Drive's modifiedTime: changes when a CSV is edited or anything is written
+        _simulate_latency()
+        csv_times = [entry.stat().st_mtime_ns for entry in os.scandir(self.directory) if entry.name.endswith(".csv")]
+        return f"offline-{max(csv_times, default=0)}-{self._version}"
+
+    def touch(self):
+        with self._lock:
+            self._version += 1
+
+    def worksheet(self, title: str) -> OfflineWorksheet:
+        _simulate_latency()
+        with self._lock:
+            if title not in self._worksheets:
+                path = os.path.join(self.directory, f"{title}.csv")
+                if not os.path.exists(path):
+                    raise WorksheetNotFound(title)
+                with open(path, newline="", encoding="utf-8-sig") as f:
+                    rows = [row for row in csv.reader(f)]
+                self._worksheets[title] = OfflineWorksheet(self, title, rows, len(self._worksheets))
+            return self._worksheets[title]
+
+    def add_worksheet(self, title: str, rows: int = 1000, cols: int = 26) -> OfflineWorksheet:
+        _simulate_latency()
+        with self._lock:
+            worksheet = OfflineWorksheet(self, title, [], len(self._worksheets))
+            self._worksheets[title] = worksheet
+            return worksheet
+
+    def batch_update(self, body: Dict):
+        _simulate_latency()
+        by_id = {ws.id: ws for ws in self._worksheets.values()}
+        for request in body.get("requests", []):
+            if "deleteDimension" not in request:
+                raise ValueError(f"Unsupported batch request in offline mode: {list(request)}")
+            target = request["deleteDimension"]["range"]
+            by_id[target["sheetId"]]._delete(target["startIndex"], target["endIndex"])
+
+class OfflineClient:
+    """
+    Stand-in for the gspread client; every spreadsheet name maps to the snapshot directory.
+    """
+
+    def __init__(self, directory: str):
+        if not os.path.isdir(directory):
+            raise ValueError(f"{OFFLINE_ENV} must point at a directory of worksheet CSVs, got '{directory}'")
+        self.directory = directory
+        self._spreadsheets: Dict[str, OfflineSpreadsheet] = {}
+
+    def open(self, name: str) -> OfflineSpreadsheet:
+        _simulate_latency()
+        if name not in self._spreadsheets:
+            self._spreadsheets[name] = OfflineSpreadsheet(self.directory)
+        return self._spreadsheets[name]
+
+# -------------------- OFFLINE SMTP -------------------- #
+class OfflineSMTP:
+    sent = 0
+
+    def login(self, user: str, password: str):
+        _simulate_latency()
+
+    def send_message(self, msg):
+        _simulate_latency()
+        OfflineSMTP.sent += 1
+        logger.debug(f"Offline send to {msg['To']}: {msg['Subject']}")
+
+    def quit(self):
+        pass
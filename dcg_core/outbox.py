@@ -0,0 +1,111 @@
+import os
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from dcg_core.offline import state_path
+from dcg_core.sender_pool import REJECTED, SENT
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", "outbox.db")
+MAX_ATTEMPTS = 3
+
+# -------------------- OUTBOX -------------------- #
+class Outbox:
+    """
+    Durable queue of emails waiting to be sent by the scheduler.
+
+    Each message carries a dedupe key, so queueing the same welcome email
+    twice (e.g. re-importing a list) only sends it once.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or state_path(OUTBOX_PATH)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                dedupe_key TEXT NOT NULL UNIQUE,
+                recipient TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                body TEXT NOT NULL,
+                subtype TEXT NOT NULL DEFAULT 'plain',
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                sent_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS outbox_status ON outbox (status, id);
+        """)
+
+    def enqueue_many(self, messages: Iterable[Dict]) -> int:
+        """
+        Queues {dedupe_key, recipient, subject, body[, subtype]} dicts; returns how many were new.
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        rows = [
+            (m["dedupe_key"], m["recipient"], m["subject"], m["body"], m.get("subtype", "plain"), now)
+            for m in messages
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO outbox (dedupe_key, recipient, subject, body, subtype, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return self._conn.total_changes - before
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox WHERE status = 'queued'").fetchone()[0]
+
+    def drain(self, sender, limit: Optional[int] = None) -> int:
+        """
+        Sends queued messages oldest-first through `sender` (an EmailSender); returns how many went out.
+        """
+        with self._lock:
+            batch = self._conn.execute(
+                "SELECT id, recipient, subject, body, subtype, attempts FROM outbox "
+                "WHERE status = 'queued' ORDER BY id LIMIT ?",
+                (-1 if limit is None else limit,)
+            ).fetchall()
+
+        sent = 0
+        for message_id, recipient, subject, body, subtype, attempts in batch:
+            outcome = sender.deliver_email(subject, body, recipient, subtype=subtype)
+            if outcome == SENT:
+                self._mark(message_id, "sent", attempts + 1)
+                sent += 1
+            elif outcome == REJECTED:
+                status = "failed" if attempts + 1 >= MAX_ATTEMPTS else "queued"
+                self._mark(message_id, status, attempts + 1)
+            else:
+                # Out of budget or throttled: not the message's fault, so keep its attempts for later
+                logger.warning("Outbox: no sender available, leaving the rest queued for the next run")
+                break
+        if batch:
+            logger.info(f"Outbox: sent {sent} of {len(batch)} queued emails attempted")
+        return sent
+
+    def _mark(self, message_id: int, status: str, attempts: int):
+        sent_at = datetime.now().isoformat(timespec="seconds") if status == "sent" else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, sent_at = ? WHERE id = ?",
+                (status, attempts, sent_at, message_id)
+            )
+
+_outbox: Optional[Outbox] = None
+_outbox_lock = threading.Lock()
+
+def get_outbox() -> Outbox:
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = Outbox()
+        return _outbox
@@ -0,0 +1,159 @@
+import io
+import os
+import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FLAG = "--profile"
+PROFILE_ENV = "DCG_PROFILE"
+
+_enabled = False
+_io_lock = threading.Lock()
+_io_stats: Dict[str, List[float]] = {}  # category -> [calls, total, max]
+_thread_profilers: List = []
+
+# -------------------- SWITCHES -------------------- #
+def profiling_requested() -> bool:
+    """
+    True when `--profile` is on the command line or DCG_PROFILE is set.
+
+    The flag is removed from sys.argv so entry points with their own
+    argparse setup don't need to know about it.
+    """
+    requested = PROFILE_FLAG in sys.argv
+    if requested:
+        sys.argv.remove(PROFILE_FLAG)
+    return requested or os.getenv(PROFILE_ENV, "").lower() in ("1", "true", "yes")
+
+# -------------------- I/O WAIT TIMERS -------------------- #
+@contextmanager
+def io_timer(category: str):
+    """
+    Records wall-clock time spent in an external call; a no-op unless profiling.
+    """
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _io_lock:
+            stats = _io_stats.setdefault(category, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+
+# -------------------- PROFILED RUN -------------------- #
+def _profile_thread(frame, event, arg):
+    # threading.setprofile hook: the first call in each new thread starts a
+    # profiler for it, which then replaces this hook for the rest of the thread
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+ allows one profiler per process, and it already sees every thread
+        sys.setprofile(None)
+        return
+    with _io_lock:
+        _thread_profilers.append(profiler)
+
+def _report_dir() -> str:
+    # Reports land next to the run log configured by setup_logging
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.FileHandler):
+            return os.path.dirname(handler.baseFilename)
+    return os.getcwd()
+
+@contextmanager
+def profiled_run(name: str, top: int = 30):
+    global _enabled
+    import cProfile
+    import tracemalloc
+
+    with _io_lock:
+        _io_stats.clear()
+        _thread_profilers.clear()
+    _enabled = True
+    tracemalloc.start(10)
+    profiler = cProfile.Profile()
+    started = datetime.now()
+    wall_start = time.perf_counter()
+    threading.setprofile(_profile_thread)
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        threading.setprofile(None)
+        wall = time.perf_counter() - wall_start
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        _enabled = False
+
+        stem = os.path.join(_report_dir(), f"{name}_profile_{started.strftime('%Y%m%d_%H%M%S')}")
+        cpu_stats, threads = _merged_stats(profiler)
+        cpu_stats.dump_stats(f"{stem}.prof")
+        with open(f"{stem}.txt", "w", encoding="utf-8") as f:
+            f.write(_render_report(name, started, wall, cpu_stats, threads, snapshot, current, peak, top))
+        logger.info(f"📊 Profile written to {stem}.txt ({stem}.prof for call-graph viewers)")
+
+def _merged_stats(profiler):
+    """
+    The main thread's profile plus every worker thread's, as one pstats.Stats.
+    """
+    import pstats
+
+    stats = pstats.Stats(profiler)
+    with _io_lock:
+        thread_profilers = list(_thread_profilers)
+        _thread_profilers.clear()
+    for thread_profiler in thread_profilers:
+        stats.add(thread_profiler)
+    return stats, 1 + len(thread_profilers)
+
+def _render_report(name, started, wall, cpu_stats, threads, snapshot, current, peak, top) -> str:
+    out = io.StringIO()
+    out.write(f"Profile: {name}\nStarted: {started.isoformat(timespec='seconds')}\nWall time: {wall:.3f}s\n\n")
+
+    out.write("== I/O wait per external call ==\n")
+    with _io_lock:
+        io_rows = sorted(_io_stats.items(), key=lambda item: item[1][1], reverse=True)
+    io_total = sum(stats[1] for _, stats in io_rows)
+    out.write(f"{'category':<32}{'calls':>8}{'total s':>10}{'mean ms':>10}{'max ms':>10}{'% wall':>8}\n")
+    for category, (calls, total, longest) in io_rows:
+        out.write(f"{category:<32}{calls:>8}{total:>10.3f}{total / calls * 1000:>10.1f}"
+                  f"{longest * 1000:>10.1f}{total / wall * 100 if wall else 0:>8.1f}\n")
+    out.write(f"I/O wait total: {io_total:.3f}s, everything else (CPU, local work): {max(wall - io_total, 0):.3f}s\n\n")
+
+    out.write(f"== Memory ==\nCurrent: {current / 1024:.1f} KiB, peak: {peak / 1024:.1f} KiB\n")
+    out.write(f"Top {top // 2} allocation sites:\n")
+    for stat in snapshot.statistics("lineno")[:top // 2]:
+        out.write(f"  {stat}\n")
+    out.write("\n")
+
+    cpu_stats.stream = out
+    cpu_stats.strip_dirs()
+    for sort_key in ("cumulative", "tottime"):
+        out.write(f"== CPU profile ({threads} threads merged), top {top} by {sort_key} ==\n")
+        cpu_stats.sort_stats(sort_key).print_stats(top)
+    return out.getvalue()
+
+def run_profiled(name: str, fn, *args, **kwargs):
+    """
+    Runs an entry point, wrapped in profiled_run when profiling was requested.
+    """
+    if not profiling_requested():
+        return fn(*args, **kwargs)
+    with profiled_run(name):
+        return fn(*args, **kwargs)
@@ -0,0 +1,107 @@
+import time
+import random
+import logging
+import threading
+from collections import deque
+from typing import Optional
+
+from dcg_core.profiling import io_timer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REQUESTS_PER_MINUTE = 60  # Sheets API per-user quota
+RETRYABLE_STATUS = {429, 500, 502, 503}
+
+def status_code(error: Exception) -> Optional[int]:
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+# -------------------- QUOTA GOVERNOR -------------------- #
+class QuotaGovernor:
+    """
+    Client-side throttle shared by every Sheets call in the process.
+
+    Calls wait for a free slot in a sliding one-minute window. A 429 (or a
+    transient 5xx) from any caller pushes a shared backoff deadline that
+    every other caller also waits out, instead of each one retrying on its own.
+    """
+
+    def __init__(self, requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+                 window: float = 60.0, max_attempts: int = 5, max_backoff: float = 64.0):
+        self.requests_per_minute = requests_per_minute
+        self.window = window
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self._calls = deque()
+        self._backoff_until = 0.0
+        self._penalty = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def used(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._calls)
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+                wait = self._backoff_until - now
+                if wait <= 0:
+                    if len(self._calls) < self.requests_per_minute:
+                        self._calls.append(now)
+                        return
+                    wait = self.window - (now - self._calls[0])
+            time.sleep(max(wait, 0.01))
+
+    def call(self, fn, *args, **kwargs):
+        category = f"sheets:{getattr(fn, '__name__', 'call')}"
+        for attempt in range(1, self.max_attempts + 1):
+            with io_timer("sheets:quota_wait"):
+                self.acquire()
+            try:
+                with io_timer(category):
+                    result = fn(*args, **kwargs)
+            except Exception as e:
+                if status_code(e) not in RETRYABLE_STATUS or attempt == self.max_attempts:
+                    raise
+                self._throttled(e)
+                continue
+            self._succeeded()
+            return result
+
+    def _expire(self, now: float):
+        while self._calls and now - self._calls[0] >= self.window:
+            self._calls.popleft()
+
+    def _throttled(self, error: Exception):
+        with self._lock:
+            self._penalty = min(self._penalty * 2 if self._penalty else 1.0, self.max_backoff)
+            delay = self._penalty + random.uniform(0, 1)
+            self._backoff_until = max(self._backoff_until, time.monotonic() + delay)
+        logger.warning(f"Sheets API throttled ({status_code(error)}), all callers backing off {delay:.1f}s")
+
+    def _succeeded(self):
+        with self._lock:
+            self._penalty = self._penalty / 2 if self._penalty > 1.0 else 0.0
+
+_governor: Optional[QuotaGovernor] = None
+_governor_lock = threading.Lock()
+
+def get_governor() -> QuotaGovernor:
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            from dcg_core.config import load_config
+
+            try:
+                rpm = load_config().get("sheets", {}).get("requests_per_minute", DEFAULT_REQUESTS_PER_MINUTE)
+            except Exception:
+                rpm = DEFAULT_REQUESTS_PER_MINUTE
+            _governor = QuotaGovernor(int(rpm))
+        return _governor
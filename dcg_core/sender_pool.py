@@ -0,0 +1,285 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List
+
+from dcg_core.offline import OfflineSMTP, offline_path, state_path
+from dcg_core.profiling import io_timer
+
+logger = logging.getLogger(__name__)
+
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 465
+DEFAULT_DAILY_LIMIT = 500  # Gmail's per-account daily sending limit
+THROTTLE_COOLDOWN = 15 * 60  # seconds an account sits out after a 421 / rate limit
+ACCOUNT_COOLDOWN = 30 * 60   # ... and after a failed login or connection
+USAGE_PATH = os.getenv("SENDER_USAGE_PATH", "sender_usage.json")
+
+# Delivery outcomes: REJECTED is about the recipient, UNAVAILABLE about our senders
+SENT = "sent"
+REJECTED = "rejected"
+UNAVAILABLE = "unavailable"
+
+# -------------------- CONFIG HELPERS -------------------- #
+def load_senders(cfg: Dict) -> List[Dict]:
+    """
+    Returns the sender identities from the parsed config.yaml.
+
+    `email.senders` is a list of {sender_email, app_password, daily_limit};
+    when it is absent the single `email.sender_email` / `app_password` pair is used.
+    """
+    email_cfg = cfg.get("email", {})
+    default_limit = email_cfg.get("daily_limit", DEFAULT_DAILY_LIMIT)
+    senders = email_cfg.get("senders") or [{
+        "sender_email": email_cfg["sender_email"],
+        "app_password": email_cfg["app_password"],
+    }]
+    return [
+        {
+            "sender_email": s["sender_email"],
+            "app_password": s["app_password"],
+            "daily_limit": int(s.get("daily_limit", default_limit)),
+        }
+        for s in senders
+    ]
+
+def _is_throttle(error: Exception) -> bool:
+    import smtplib
+
+    if not isinstance(error, smtplib.SMTPResponseException):
+        return False
+    message = error.smtp_error.decode("utf-8", "ignore") if isinstance(error.smtp_error, bytes) else str(error.smtp_error)
+    # 421/454: temporary rate limiting, 5.4.5: daily sending quota exceeded
+    return error.smtp_code in (421, 454) or "5.4.5" in message or "rate limit" in message.lower()
+
+def _is_account_error(error: Exception) -> bool:
+    import smtplib
+
+    # The account can't send at all right now (bad app password, server unreachable),
+    # whoever the recipient is. SMTPException subclasses OSError, hence the second check.
+    if isinstance(error, (smtplib.SMTPAuthenticationError, smtplib.SMTPConnectError, smtplib.SMTPHeloError,
+                          smtplib.SMTPSenderRefused, smtplib.SMTPServerDisconnected)):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+def _is_recipient_error(error: Exception) -> bool:
+    import smtplib
+
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    # 550/553: mailbox unavailable or address not allowed
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code in (550, 553) and not _is_throttle(error)
+
+# -------------------- USAGE PERSISTENCE -------------------- #
+_usage_lock = threading.Lock()
+
+def _today() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+def _read_usage() -> Dict[str, int]:
+    usage_path = state_path(USAGE_PATH)
+    if not os.path.exists(usage_path):
+        return {}
+    try:
+        with open(usage_path, "r", encoding="utf-8") as f:
+            usage = json.load(f)
+    except Exception as e:
+        logger.warning(f"Could not read sender usage from {usage_path}: {e}")
+        return {}
+    if usage.get("date") != _today():
+        return {}
+    return {email: int(count) for email, count in usage.get("sent", {}).items()}
+
+@contextmanager
+def _locked_usage():
+    # The cron scheduler and the long-lived forms send from the same accounts,
+    # so the usage file is locked across processes, not just threads.
+    with _usage_lock:
+        try:
+            import fcntl
+        except ImportError:  # Windows: only threads of this process are serialized
+            yield
+            return
+        with open(f"{state_path(USAGE_PATH)}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _record_send(account: "SenderAccount") -> int:
+    """
+    Adds one send to the account's stored count for today and returns the new total.
+    """
+    usage_path = state_path(USAGE_PATH)
+    with _locked_usage():
+        sent = _read_usage()
+        sent[account.sender_email] = sent.get(account.sender_email, 0) + 1
+        try:
+            tmp_path = f"{usage_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"date": _today(), "sent": sent}, f)
+            os.replace(tmp_path, usage_path)
+        except Exception as e:
+            logger.warning(f"Could not persist sender usage to {usage_path}: {e}")
+        return sent[account.sender_email]
+
+# -------------------- SENDER ACCOUNT -------------------- #
+class SenderAccount:
+    def __init__(self, sender_email: str, app_password: str, daily_limit: int):
+        self.sender_email = sender_email
+        self.app_password = app_password
+        self.daily_limit = daily_limit
+        self.day = _today()
+        self.sent_today = _read_usage().get(sender_email, 0)
+        self.unavailable_until = 0.0
+        self.lock = threading.Lock()
+        self._smtp = None
+
+    @property
+    def remaining(self) -> int:
+        self.roll_day()
+        self.refresh()
+        if time.time() < self.unavailable_until:
+            return 0
+        return max(self.daily_limit - self.sent_today, 0)
+
+    def roll_day(self):
+        # Long-lived processes (e.g. the Streamlit form) outlive a single day
+        today = _today()
+        if today != self.day:
+            self.day = today
+            self.sent_today = 0
+            self.unavailable_until = 0.0
+
+    def cool_down(self, seconds: float):
+        # Sit out for a while instead of until midnight: long-lived forms recover on their own
+        self.unavailable_until = time.time() + seconds
+        self.close()
+
+    def refresh(self):
+        # Pick up sends made by other processes sharing this account
+        self.sent_today = max(self.sent_today, _read_usage().get(self.sender_email, 0))
+
+    def deliver(self, msg):
+        import smtplib
+
+        # The SMTP session is kept open across sends; Gmail drops idle
+        # connections, so reconnect once if the server hung up on us.
+        with self.lock:
+            try:
+                self._send(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._smtp = None
+                self._send(msg)
+            self.sent_today = max(self.sent_today + 1, _record_send(self))
+
+    def _send(self, msg):
+        connection = self._connection()
+        with io_timer("smtp:send_message"):
+            connection.send_message(msg)
+
+    def _connection(self):
+        if self._smtp is None:
+            with io_timer("smtp:connect"):
+                smtp = self._open_smtp()
+                smtp.login(self.sender_email, self.app_password)
+            self._smtp = smtp
+        return self._smtp
+
+    def _open_smtp(self):
+        if offline_path():
+            return OfflineSMTP()
+        import smtplib
+
+        return smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT)
+
+    def close(self):
+        with self.lock:
+            if self._smtp is None:
+                return
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+# Accounts are shared process-wide, so pools that list the same sender
+# (e.g. several campaigns) share its SMTP session and daily budget.
+_accounts: Dict[str, SenderAccount] = {}
+_accounts_lock = threading.Lock()
+
+def get_account(sender: Dict) -> SenderAccount:
+    with _accounts_lock:
+        account = _accounts.get(sender["sender_email"])
+        if account is None:
+            account = SenderAccount(sender["sender_email"], sender["app_password"], sender["daily_limit"])
+            _accounts[sender["sender_email"]] = account
+        return account
+
+# -------------------- SENDER POOL -------------------- #
+class SenderPool:
+    def __init__(self, senders: List[Dict]):
+        if not senders:
+            raise ValueError("At least one sender account must be configured")
+        self.accounts = [get_account(s) for s in senders]
+
+    @property
+    def remaining(self) -> int:
+        return sum(account.remaining for account in self.accounts)
+
+    def candidates(self, recipient_email: str) -> List[SenderAccount]:
+        # Rendezvous hashing: every recipient has a stable preferred sender,
+        # and adding or removing an account only moves that account's share.
+        recipient = recipient_email.strip().lower()
+
+        def weight(account: SenderAccount) -> str:
+            return hashlib.md5(f"{account.sender_email}|{recipient}".encode("utf-8")).hexdigest()
+
+        return sorted(self.accounts, key=weight, reverse=True)
+
+    def send(self, msg, recipient_email: str) -> bool:
+        return self.deliver(msg, recipient_email) == SENT
+
+    def deliver(self, msg, recipient_email: str) -> str:
+        """
+        Sends through the first candidate with budget; returns SENT, REJECTED or UNAVAILABLE.
+        """
+        for account in self.candidates(recipient_email):
+            if account.remaining <= 0:
+                continue
+            del msg["From"]
+            msg["From"] = account.sender_email
+            try:
+                account.deliver(msg)
+            except Exception as e:
+                if _is_throttle(e):
+                    logger.warning(f"Sender {account.sender_email} throttled, failing over: {e}")
+                    account.cool_down(THROTTLE_COOLDOWN)
+                    continue
+                if _is_account_error(e):
+                    logger.error(f"Sender {account.sender_email} can't send, failing over: {e}")
+                    account.cool_down(ACCOUNT_COOLDOWN)
+                    continue
+                logger.error(f"Failed to send email to {recipient_email} via {account.sender_email}: {e}")
+                return REJECTED if _is_recipient_error(e) else UNAVAILABLE
+            return SENT
+
+        logger.error(f"No sender account is available to reach {recipient_email}")
+        return UNAVAILABLE
+
+    def close(self):
+        for account in self.accounts:
+            account.close()
+
+def distinct_remaining(pools: List[SenderPool]) -> int:
+    """
+    Remaining daily budget across pools, counting each shared account once.
+    """
+    accounts = {account.sender_email: account for pool in pools for account in pool.accounts}
+    return sum(account.remaining for account in accounts.values())
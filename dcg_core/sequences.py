@@ -0,0 +1,57 @@
+import os
+import json
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+CTA_SUBJECT = "👋 Still Thinking It Over? Let's Talk"
+CTA_MESSAGE = """Hi {name},
+
+We noticed you haven't scheduled your free strategy call yet.
+
+We're here to help you move forward with funding that fits your vision.
+
+📅 Book your call now: https://calendly.com/dcgcapital3/30min
+
+Looking forward to helping you grow,  
+Doriscar Capital Group
+"""
+
+# -------------------- EMAIL SEQUENCE MANAGER -------------------- #
+class EmailSequenceManager:
+    def __init__(self, config):
+        self.config = config
+        self.cta_message = CTA_MESSAGE
+        self._sequences: Dict[str, List[Dict]] = {}
+
+    def sequence_path(self, segment_name: str) -> str:
+        return os.path.join(
+            self.config.email_sequence_folder,
+            f"{segment_name.strip().lower().replace(' ', '_')}.json"
+        )
+
+    def load_sequence(self, segment_name: str) -> List[Dict]:
+        # Sequence files are read once per manager instead of once per contact
+        key = segment_name.strip().lower()
+        if key not in self._sequences:
+            self._sequences[key] = self._read_sequence(segment_name)
+        return self._sequences[key]
+
+    def _read_sequence(self, segment_name: str) -> List[Dict]:
+        filename = self.sequence_path(segment_name)
+        try:
+            if not os.path.exists(filename):
+                logger.warning(f"No sequence found for segment: {segment_name}")
+                return []
+            with open(filename, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load sequence {filename}: {e}")
+            return []
+
+    def get_cta_message(self, name: str) -> tuple:
+        return (
+            CTA_SUBJECT,
+            self.cta_message.replace("{name}", name if name else "there")
+        )
@@ -0,0 +1,374 @@
+import os
+import gzip
+import json
+import time
+import atexit
+import base64
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from dcg_core.offline import offline_path, state_path
+from dcg_core.quota import get_governor
+
+logger = logging.getLogger(__name__)
+
+SCOPE = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive"
+]
+CREDENTIALS_PATH = "credentials.json"
+SNAPSHOT_DIR = os.getenv("SHEET_SNAPSHOT_DIR", "sheet_snapshots")
+
+_client = None
+_client_lock = threading.Lock()
+
+# -------------------- CREDENTIALS MANAGER -------------------- #
+def setup_credentials() -> str:
+    creds_path = os.path.abspath(CREDENTIALS_PATH)
+    encoded = os.getenv("GOOGLE_CREDENTIALS_BASE64")
+    if encoded:
+        with open(creds_path, "wb") as f:
+            f.write(base64.b64decode(encoded))
+    elif not os.path.exists(creds_path):
+        raise ValueError("Missing GOOGLE_CREDENTIALS_BASE64 in environment and no credentials.json on disk")
+    return creds_path
+
+def get_client():
+    """
+    Returns the process-wide authorized gspread client, authorizing on first use.
+    """
+    global _client
+    with _client_lock:
+        if _client is None and offline_path():
+            from dcg_core.offline import OfflineClient
+
+            _client = OfflineClient(offline_path())
+            logger.info(f"🧪 Offline mode: using {offline_path()} instead of Google Sheets")
+        if _client is None:
+            import gspread
+            from oauth2client.service_account import ServiceAccountCredentials
+
+            creds = ServiceAccountCredentials.from_json_keyfile_name(setup_credentials(), SCOPE)
+            _client = gspread.authorize(creds)
+        return _client
+
+def open_worksheet(sheet_name: str, worksheet_name: str, create_with_headers: Optional[List[str]] = None):
+    governor = get_governor()
+    spreadsheet = governor.call(get_client().open, sheet_name)
+    try:
+        return governor.call(spreadsheet.worksheet, worksheet_name)
+    except Exception as e:
+        if create_with_headers is None or type(e).__name__ != "WorksheetNotFound":
+            raise
+    worksheet = governor.call(spreadsheet.add_worksheet, worksheet_name, rows=1000, cols=len(create_with_headers))
+    governor.call(worksheet.append_row, create_with_headers)
+    logger.info(f"Created worksheet '{worksheet_name}' in '{sheet_name}'")
+    return worksheet
+
+def a1(row: int, col: int) -> str:
+    letters = ""
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return f"{letters}{row}"
+
+def _last_update_time(spreadsheet) -> str:
+    # One Drive metadata request; gspread 6 made the property a method
+    getter = getattr(spreadsheet, "get_lastUpdateTime", None)
+    return getter() if getter else spreadsheet.lastUpdateTime
+
+# -------------------- SHARED WORKSHEET STATE -------------------- #
+class _WorksheetState:
+    # One per worksheet per process, shared by every SheetClient pointing at it,
+    # so concurrent callers coalesce onto the same reads and write batches.
+    def __init__(self, worksheet, key: Tuple[str, str]):
+        self.worksheet = worksheet
+        self.key = key
+        self.lock = threading.RLock()
+        self.records: Optional[List[Dict]] = None
+        self.fetched_at = 0.0
+        self.pending: Dict[Tuple[int, int], str] = {}
+        self.pending_since: Optional[float] = None
+        self.max_delay = 5.0
+        # Spreadsheet revision the records match, and when they were last downloaded in full
+        self.revision: Optional[str] = None
+        self.snapshot_at = 0.0
+
+    @property
+    def snapshot_path(self) -> str:
+        name = hashlib.md5("|".join(self.key).encode("utf-8")).hexdigest()
+        return os.path.join(state_path(SNAPSHOT_DIR), f"{name}.json.gz")
+
+    def fetch_revision(self) -> Optional[str]:
+        try:
+            return get_governor().call(_last_update_time, self.worksheet.spreadsheet)
+        except Exception as e:
+            logger.debug(f"Could not read spreadsheet revision, falling back to a full fetch: {e}")
+            return None
+
+    def forget_revision(self):
+        # Our write moved the sheet past the snapshot's revision. Confirming that
+        # nobody else wrote too would cost metadata calls on every flush, so the
+        # patched records only serve reads within read_ttl and the next read after
+        # that downloads the sheet again.
+        self.revision = None
+
+    def invalidate(self):
+        self.records = None
+        self.revision = None
+
+    def load_snapshot(self) -> bool:
+        if not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with gzip.open(self.snapshot_path, "rt", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable sheet snapshot {self.snapshot_path}: {e}")
+            return False
+        self.records = snapshot["records"]
+        self.revision = snapshot["revision"]
+        self.snapshot_at = snapshot["snapshot_at"]
+        return True
+
+    def save_snapshot(self):
+        if self.records is None or self.revision is None:
+            return
+        try:
+            os.makedirs(state_path(SNAPSHOT_DIR), exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=1) as f:
+                json.dump({"revision": self.revision, "snapshot_at": self.snapshot_at,
+                           "records": self.records}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            logger.warning(f"Could not save sheet snapshot to {self.snapshot_path}: {e}")
+
+_worksheets: Dict[Tuple[str, str], _WorksheetState] = {}
+_worksheets_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+
+def _worksheet_state(sheet_name: str, worksheet_name: str) -> _WorksheetState:
+    key = (sheet_name, worksheet_name)
+    with _worksheets_lock:
+        if key not in _worksheets:
+            _worksheets[key] = _WorksheetState(open_worksheet(sheet_name, worksheet_name), key)
+        return _worksheets[key]
+
+def _start_flusher():
+    global _flusher
+    with _worksheets_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_overdue, name="sheets-flusher", daemon=True)
+            _flusher.start()
+
+def _flush_overdue():
+    # atexit never runs when cron kills the process, so buffered writes must
+    # land within write_max_delay on their own, not only on the next update_cell
+    while True:
+        time.sleep(1)
+        for state in list(_worksheets.values()):
+            since = state.pending_since
+            if since is not None and time.monotonic() - since >= state.max_delay:
+                _flush(state)
+
+@atexit.register
+def flush_all():
+    for state in list(_worksheets.values()):
+        _flush(state)
+
+def _flush(state: _WorksheetState) -> bool:
+    with state.lock:
+        if not state.pending:
+            return True
+        data = [{"range": a1(row, col), "values": [[value]]} for (row, col), value in state.pending.items()]
+        state.pending = {}
+        state.pending_since = None
+        try:
+            get_governor().call(state.worksheet.batch_update, data, value_input_option="USER_ENTERED")
+        except Exception as e:
+            logger.error(f"Failed to flush {len(data)} cell updates: {e}")
+            # The cached records were patched with values that never landed
+            state.invalidate()
+            return False
+        logger.debug(f"Flushed {len(data)} coalesced cell updates")
+        state.forget_revision()
+        return True
+
+# -------------------- GOOGLE SHEETS CLIENT -------------------- #
+class SheetClient:
+    def __init__(self, config):
+        self.config = config
+        self._state = self._get_state()
+        self.sheet = self._state.worksheet if self._state else None
+
+    def _get_state(self) -> Optional[_WorksheetState]:
+        try:
+            return _worksheet_state(self.config.sheet_name, self.config.worksheet_name)
+        except Exception as e:
+            logger.error(f"Failed to access worksheet: {e}")
+            return None
+
+    def get_all_records(self, fresh: bool = False, verify: bool = False) -> List[Dict]:
+        """
+        Returns the worksheet's rows, downloading them only when the spreadsheet changed.
+
+        Within `read_ttl` the cached rows are reused as-is. After that one
+        metadata call compares the spreadsheet's last update time with the
+        snapshot (in memory, or on disk from an earlier run); the full sheet
+        is only downloaded when they differ, the snapshot is older than
+        `snapshot_max_age`, or `fresh` is set. `verify` skips the `read_ttl`
+        shortcut, for callers about to write by row number.
+        """
+        if not self._state:
+            return []
+        state = self._state
+        # Holding the lock makes concurrent readers wait on a single fetch
+        with state.lock:
+            if (not fresh and not verify and state.records is not None
+                    and time.monotonic() - state.fetched_at < self.config.read_ttl):
+                return list(state.records)
+            _flush(state)
+
+            # Read before downloading, so a change landing mid-download is caught next time
+            revision = state.fetch_revision() if self.config.snapshot_max_age else None
+            if not fresh and revision is not None and self._snapshot_matches(revision):
+                state.fetched_at = time.monotonic()
+                logger.debug(f"Sheet unchanged since {revision}, served {len(state.records)} rows from snapshot")
+                return list(state.records)
+
+            try:
+                state.records = get_governor().call(state.worksheet.get_all_records)
+            except Exception as e:
+                logger.error(f"Failed to fetch records: {e}")
+                return []
+            state.fetched_at = time.monotonic()
+            state.revision = revision
+            state.snapshot_at = time.time()
+            state.save_snapshot()
+            return list(state.records)
+
+    def _snapshot_matches(self, revision: str) -> bool:
+        state = self._state
+        if state.records is None and not state.load_snapshot():
+            return False
+        return (state.revision == revision
+                and time.time() - state.snapshot_at < self.config.snapshot_max_age)
+
+    def update_cell(self, row: int, col: int, value: str):
+        if not self._state:
+            return
+        state = self._state
+        with state.lock:
+            state.pending[(row, col)] = value
+            if state.pending_since is None:
+                state.pending_since = time.monotonic()
+                state.max_delay = self.config.write_max_delay
+                _start_flusher()
+            self._patch_records(row, col, value)
+            if (len(state.pending) >= self.config.write_batch_size
+                    or time.monotonic() - state.pending_since >= self.config.write_max_delay):
+                _flush(state)
+
+    def update_cells(self, updates: Dict[Tuple[int, int], str]) -> bool:
+        """
+        Writes many cells as a single batch_update call.
+        """
+        if not self._state:
+            return False
+        state = self._state
+        with state.lock:
+            for (row, col), value in updates.items():
+                state.pending[(row, col)] = value
+                self._patch_records(row, col, value)
+            return _flush(state)
+
+    def ensure_columns(self, headers: List[str]) -> Dict[str, int]:
+        """
+        Returns the 1-based column of each header, adding missing ones after the last used column.
+        """
+        if not self._state:
+            raise RuntimeError("Google Sheets client not available")
+        state = self._state
+        with state.lock:
+            existing = get_governor().call(state.worksheet.row_values, 1)
+            columns = {header: idx for idx, header in enumerate(existing, start=1)}
+            missing = [header for header in headers if header not in columns]
+            if not missing:
+                return {header: columns[header] for header in headers}
+
+            needed = len(existing) + len(missing)
+            if state.worksheet.col_count < needed:
+                get_governor().call(state.worksheet.add_cols, needed - state.worksheet.col_count)
+            for offset, header in enumerate(missing, start=len(existing) + 1):
+                columns[header] = offset
+                state.pending[(1, offset)] = header
+            _flush(state)
+            state.invalidate()  # cached rows don't carry the new columns
+            return {header: columns[header] for header in headers}
+
+    def append_rows(self, rows: List[List]):
+        if not self._state:
+            raise RuntimeError("Google Sheets client not available")
+        state = self._state
+        with state.lock:
+            _flush(state)
+            get_governor().call(state.worksheet.append_rows, rows)
+            if state.records and self._records_trusted():
+                headers = list(state.records[0].keys())
+                state.records.extend(dict(zip(headers, row)) for row in rows)
+                state.forget_revision()
+            else:
+                state.invalidate()
+
+    def delete_rows(self, rows: List[int]):
+        """
+        Deletes the given 1-based rows in a single batch request.
+        """
+        if not self._state:
+            raise RuntimeError("Google Sheets client not available")
+        state = self._state
+        with state.lock:
+            # Buffered writes address rows by index, so land them before anything shifts
+            if not _flush(state):
+                raise RuntimeError("Could not flush pending writes before deleting rows")
+            ranges = []
+            for row in sorted(set(rows), reverse=True):
+                if ranges and ranges[-1][0] == row + 1:
+                    ranges[-1][0] = row
+                else:
+                    ranges.append([row, row])
+            # Bottom-up so earlier deletions don't shift the later ranges
+            requests = [
+                {"deleteDimension": {"range": {
+                    "sheetId": state.worksheet.id, "dimension": "ROWS",
+                    "startIndex": start - 1, "endIndex": end,
+                }}}
+                for start, end in ranges
+            ]
+            get_governor().call(state.worksheet.spreadsheet.batch_update, {"requests": requests})
+            state.invalidate()
+
+    def flush(self):
+        if self._state:
+            _flush(self._state)
+
+    def _records_trusted(self) -> bool:
+        # Past read_ttl another process may have changed the sheet, so patching
+        # the cached records would only dress up a stale copy
+        return time.monotonic() - self._state.fetched_at < self.config.read_ttl
+
+    def _patch_records(self, row: int, col: int, value: str):
+        # Keep the cached snapshot in step with buffered writes so reads see them
+        if not self._records_trusted():
+            self._state.invalidate()
+            return
+        records = self._state.records
+        index = row - 2  # header row + 1-based rows
+        if not records or not 0 <= index < len(records):
+            return
+        headers = list(records[0].keys())
+        if col - 1 < len(headers):
+            records[index][headers[col - 1]] = value
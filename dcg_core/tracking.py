@@ -0,0 +1,147 @@
+import os
+import re
+import hmac
+import json
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+# Aliased: ClickAggregator takes a `state_path` argument
+from dcg_core.offline import state_path as local_state_path
+
+logger = logging.getLogger(__name__)
+
+URL_PATTERN = re.compile(r"https?://[^\s'\"<>)]+")
+CLICK_STATS_PATH = os.getenv("CLICK_STATS_PATH", "click_stats.json")
+
+# -------------------- LINK TRACKER -------------------- #
+class LinkTracker:
+    """
+    Rewrites outgoing links to go through the click redirect in click_tracker.py.
+
+    Tracking is off unless `tracking.base_url` and `tracking.secret` are set;
+    links are signed so the redirect can't be used as an open redirect.
+    """
+
+    def __init__(self, config):
+        self.base_url = config.tracking_base_url
+        self.secret = (config.tracking_secret or "").encode("utf-8")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.base_url and self.secret)
+
+    def sign(self, url: str, email: str, segment: str, step: str) -> str:
+        message = "|".join((url, email, segment, step)).encode("utf-8")
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()[:16]
+
+    def wrap(self, url: str, email: str, segment: str, step: str) -> str:
+        if not self.enabled or url.startswith(self.base_url):
+            return url
+        email = email.strip().lower()
+        query = urlencode({
+            "u": url, "e": email, "s": segment, "st": step,
+            "sig": self.sign(url, email, segment, step),
+        })
+        return f"{self.base_url}?{query}"
+
+    def track_links(self, body: str, email: str, segment: str, step: str) -> str:
+        if not self.enabled:
+            return body
+        return URL_PATTERN.sub(lambda m: self.wrap(m.group(0), email, segment, step), body)
+
+    def verify(self, params: Dict[str, str]) -> Optional[str]:
+        """
+        Returns the destination URL if the redirect parameters carry a valid signature.
+        """
+        url, email, segment, step = (params.get(k, "") for k in ("u", "e", "s", "st"))
+        if not self.enabled or not url or not URL_PATTERN.fullmatch(url):
+            return None
+        if not hmac.compare_digest(self.sign(url, email, segment, step), params.get("sig", "")):
+            return None
+        return url
+
+# -------------------- CLICK LOG -------------------- #
+class ClickLog:
+    def __init__(self, path: str):
+        self.path = path
+
+    def append(self, email: str, segment: str, step: str, url: str):
+        event = {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "email": email, "segment": segment, "step": step, "url": url,
+        }
+        # A single short write in append mode lands atomically, so concurrent
+        # redirect handlers never interleave lines.
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+# -------------------- CLICK AGGREGATOR -------------------- #
+class ClickAggregator:
+    """
+    Rolls new click log lines into running totals per contact and per (segment, step).
+
+    Totals and the log offset already processed live in a small JSON state
+    file, so each run only reads what was appended since the last one.
+    """
+
+    def __init__(self, log_path: str, state_path: Optional[str] = None):
+        self.log_path = log_path
+        self.state_path = state_path or local_state_path(CLICK_STATS_PATH)
+        self.state = self._load_state()
+
+    def collect(self) -> Dict[str, Dict]:
+        """
+        Reads new clicks and returns the contacts whose totals changed.
+        """
+        changed: Dict[str, Dict] = {}
+        if not os.path.exists(self.log_path):
+            return changed
+        contacts = self.state["contacts"]
+        steps = self.state["steps"]
+
+        with open(self.log_path, "rb") as f:
+            f.seek(self.state["offset"])
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # partially written line; pick it up next run
+                self.state["offset"] += len(raw)
+                try:
+                    event = json.loads(raw)
+                except ValueError:
+                    logger.warning(f"Skipping malformed click log line: {raw[:80]!r}")
+                    continue
+                email = event.get("email", "")
+                contact = contacts.setdefault(email, {"clicks": 0, "last_click": ""})
+                contact["clicks"] += 1
+                contact["last_click"] = max(contact["last_click"], event.get("ts", ""))
+                key = f"{event.get('segment', '')}|{event.get('step', '')}"
+                steps[key] = steps.get(key, 0) + 1
+                changed[email] = contact
+        return changed
+
+    def save(self):
+        # A truncated state file would restart from offset 0 and count every click twice
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def step_totals(self) -> Dict[str, Dict[str, int]]:
+        totals: Dict[str, Dict[str, int]] = {}
+        for key, count in self.state["steps"].items():
+            segment, step = key.split("|", 1)
+            totals.setdefault(segment, {})[step] = count
+        return totals
+
+    def _load_state(self) -> Dict:
+        state = {"offset": 0, "contacts": {}, "steps": {}}
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, "r", encoding="utf-8") as f:
+                    state.update(json.load(f))
+            except Exception as e:
+                logger.warning(f"Could not read click stats from {self.state_path}: {e}")
+        return state
@@ -0,0 +1,13 @@
+import re
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# -------------------- VALIDATION -------------------- #
+def is_valid_email(email: str) -> bool:
+    return bool(EMAIL_PATTERN.match(email))
+
+def is_valid_segment(segment: str) -> bool:
+    return bool(segment and isinstance(segment, str) and segment.strip())
+
+def normalize(s: str) -> str:
+    return s.replace("\xa0", " ").strip().lower()
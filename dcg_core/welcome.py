@@ -0,0 +1,40 @@
+from typing import Optional, Tuple
+
+from dcg_core.funnel import PENDING_SEGMENT
+from dcg_core.tracking import LinkTracker
+
+WELCOME_BASE_URL = "https://yourdomain.com/select"  # ✅ Replace with your actual URL
+WELCOME_SUBJECT = "Welcome to Doriscar Capital Group!"
+
+# -------------------- WELCOME EMAIL -------------------- #
+def build_welcome_email(name: str, email: str, tracker: Optional[LinkTracker] = None) -> Tuple[str, str]:
+    segment_links = "\n".join([
+        f"📈 Business Financing: {WELCOME_BASE_URL}?email={email}&segment=Business+Financing",
+        f"💳 Credit Building: {WELCOME_BASE_URL}?email={email}&segment=Credit+Building",
+        f"📚 Financial Education: {WELCOME_BASE_URL}?email={email}&segment=Financial+Education",
+        f"🤝 Referral Opportunities: {WELCOME_BASE_URL}?email={email}&segment=Referral+Partnership"
+    ])
+
+    body = f"""Hi {name},
+
+Thanks for connecting with us!
+
+We help ambitious individuals and business owners with:
+
+👉 Business Financing  
+👉 Credit Building  
+👉 Financial Education  
+👉 Referral & Partnership Opportunities
+
+Let us know what you’d like to learn more about. Just click one:
+
+{segment_links}
+
+Once you click, we’ll make sure you only receive what’s most relevant to you.
+
+Best regards,  
+Doriscar Capital Group
+"""
+    if tracker:
+        body = tracker.track_links(body, email, PENDING_SEGMENT, "Welcome")
+    return WELCOME_SUBJECT, body
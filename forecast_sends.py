@@ -0,0 +1,74 @@
+import json
+import logging
+import argparse
+from datetime import datetime
+
+from dcg_core.config import load_campaigns, load_config
+from dcg_core.forecast import SECONDS_PER_SEND, CampaignBuckets, SendForecaster, read_snapshot
+from dcg_core.logging_setup import setup_logging
+from dcg_core.outbox import get_outbox
+from dcg_core.profiling import run_profiled
+from dcg_core.quota import DEFAULT_REQUESTS_PER_MINUTE
+from dcg_core.sheets import SheetClient
+
+# -------------------- LOGGING SETUP -------------------- #
+setup_logging("email_campaign.log")
+logger = logging.getLogger(__name__)
+
+# -------------------- REPORT -------------------- #
+def print_forecast(days: list, assumptions: dict):
+    print(f"{'date':<12}{'due':>8}{'sends':>8}{'outbox':>8}{'deferred':>10}"
+          f"{'gmail left':>12}{'cells':>8}{'flushes':>9}{'requests':>10}{'min@quota':>11}")
+    for day in days:
+        print(f"{day['date']:<12}{day['due']:>8}{day['sends']:>8}{day['outbox']:>8}{day['deferred']:>10}"
+              f"{day['gmail_headroom']:>12}{day['sheet_cells']:>8}{day['sheet_flushes']:>9}"
+              f"{day['sheets_requests']:>10}{day['sheets_minutes']:>11}")
+    print(f"\nRequests assume {assumptions['seconds_per_send']}s per send, one after another; buffered writes "
+          f"flush every write_max_delay seconds, plus {assumptions['requests_per_run']} read requests per campaign per run.")
+
+# -------------------- MAIN FUNCTION -------------------- #
+def main():
+    parser = argparse.ArgumentParser(description="Project daily sends and Sheets usage without sending anything")
+    parser.add_argument("--days", type=int, default=14, help="number of daily runs to simulate")
+    parser.add_argument("--start", help="first simulated day (YYYY-MM-DD), default today")
+    parser.add_argument("--csv", help="read contacts from a CSV export instead of the sheet")
+    parser.add_argument("--campaign", help="only forecast this campaign")
+    parser.add_argument("--seconds-per-send", type=float, default=SECONDS_PER_SEND,
+                        help="assumed SMTP time per email, which sets how often buffered writes flush")
+    parser.add_argument("--json", action="store_true", help="print the forecast as JSON")
+    args = parser.parse_args()
+
+    configs = load_campaigns()
+    if args.campaign:
+        configs = [c for c in configs if c.campaign_name == args.campaign]
+        if not configs:
+            raise SystemExit(f"No campaign named '{args.campaign}' in config.yaml")
+    if args.csv and len(configs) > 1:
+        raise SystemExit("--csv holds one campaign's contacts; pick it with --campaign")
+
+    campaigns = []
+    for config in configs:
+        campaign = CampaignBuckets(config)
+        campaign.add_rows(read_snapshot(args.csv) if args.csv else SheetClient(config).get_all_records())
+        if campaign.skipped:
+            logger.warning(f"Skipped {campaign.skipped} rows with unrecognized Next_Step_Date [{config.campaign_name}]")
+        campaigns.append(campaign)
+
+    cfg = load_config()
+    forecaster = SendForecaster(
+        campaigns,
+        send_budget=cfg.get("email", {}).get("send_budget"),
+        outbox_pending=get_outbox().pending(),
+        requests_per_minute=int(cfg.get("sheets", {}).get("requests_per_minute", DEFAULT_REQUESTS_PER_MINUTE)),
+        seconds_per_send=args.seconds_per_send,
+    )
+    start = datetime.strptime(args.start, "%Y-%m-%d").date() if args.start else None
+    days = forecaster.run(args.days, start)
+
+    if args.json:
+        print(json.dumps({"assumptions": forecaster.assumptions(), "days": days}, indent=2, ensure_ascii=False))
+    else:
+        print_forecast(days, forecaster.assumptions())
+
+if __name__ == "__main__":
+    run_profiled("forecast_sends", main)
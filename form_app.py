@@ -1,54 +1,31 @@
 import streamlit as st
-import os
-import base64
 from datetime import datetime, timedelta
 from urllib.parse import unquote
 import logging
-import yaml
-import re
 import string
-
-from typing import Optional, List
-from segment_updater import Config as SegmentConfig, SegmentManager, SheetClient
+import time
+
+from dcg_core.config import Config
+from dcg_core.funnel import NOT_STARTED, campaign_key, get_funnel
+from dcg_core.jobs import JobQueue, JobWorker
+from dcg_core.locks import row_lock
+from dcg_core.logging_setup import setup_logging
+from dcg_core.tracking import LinkTracker
+from dcg_core.validation import is_valid_email
+from segment_updater import SegmentManager
 from send_scheduled_emails import EmailSender, EmailSequenceManager
-import sys
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # -------------------- LOGGING SETUP -------------------- #
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler("streamlit_app.log"),
-        logging.StreamHandler()
-    ]
-)
+setup_logging("streamlit_app.log")
 logger = logging.getLogger(__name__)
 
-# -------------------- CONFIGURATION -------------------- #
-class AppConfig:
-    def __init__(self):
-        config_path = os.getenv("CONFIG_PATH", "config.yaml")
-        try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                cfg = yaml.safe_load(f)
-            self.page_title = cfg.get("app", {}).get("page_title", "Tell Us What You're Interested In")
-            self.segments = cfg.get("app", {}).get("segments", [])
-        except Exception as e:
-            logger.error(f"Failed to load application configuration: {e}")
-            raise
-
-# -------------------- VALIDATION -------------------- #
-def is_valid_email(email: str) -> bool:
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
-
+# -------------------- HELPERS -------------------- #
 def smart_capitalize(s: str) -> str:
     return string.capwords(s.replace(".", " ").replace("_", " ")).replace(" ", "")
 
 # -------------------- UI MANAGER -------------------- #
 class UIManager:
-    def __init__(self, config: AppConfig):
+    def __init__(self, config: Config):
         self.config = config
         self.setup_page()
 
@@ -68,11 +45,12 @@ class UIManager:
 
 # -------------------- SEGMENT HANDLER -------------------- #
 class SegmentHandler:
-    def __init__(self, segment_config: SegmentConfig):
-        self.segment_manager = SegmentManager(segment_config)
-        self.email_sender = EmailSender(segment_config)
-        self.sequence_manager = EmailSequenceManager(segment_config)
-        self.sheet = SheetClient(segment_config).sheet
+    def __init__(self, config: Config):
+        self.segment_manager = SegmentManager(config)
+        self.email_sender = EmailSender(config)
+        self.sequence_manager = EmailSequenceManager(config)
+        self.link_tracker = LinkTracker(config)
+        self.sheet_client = self.segment_manager.sheet_client
 
     def update_segment_and_send_email(self, email: str, segment: str) -> bool:
         try:
@@ -104,20 +82,25 @@ class SegmentHandler:
             # Send Week 1 email
             subject = first_email["subject"]
             body = first_email["body"].replace("{name}", name or "there")
+            body = self.link_tracker.track_links(body, email, segment, "Week 1")
             email_sent = self.email_sender.send_email(subject, body, email)
 
             if not email_sent:
                 logger.error(f"Email sending failed for: {email}")
                 return False
 
-            # Update Google Sheet: Last_Email_Sent and Next_Step_Date
-            records = self.sheet.get_all_records()
-            for idx, row in enumerate(records):
-                if row.get("Email", "").strip().lower() == email.lower():
-                    row_index = idx + 2
-                    self.sheet.update_cell(row_index, 4, "Week 1")
-                    self.sheet.update_cell(row_index, 5, (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d"))
-                    break
+            # Update Google Sheet: Last_Email_Sent and Next_Step_Date.
+            # The lock keeps the archiver from shifting rows between lookup and write.
+            with row_lock():
+                records = self.sheet_client.get_all_records(verify=True)
+                for idx, row in enumerate(records):
+                    if row.get("Email", "").strip().lower() == email.lower():
+                        row_index = idx + 2
+                        self.sheet_client.update_cell(row_index, 4, "Week 1")
+                        self.sheet_client.update_cell(row_index, 5, (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d"))
+                        self.sheet_client.flush()
+                        get_funnel().record(campaign_key(self.sheet_client.config), (segment, NOT_STARTED), (segment, "Week 1"))
+                        break
 
             return True
 
@@ -126,12 +109,49 @@ class SegmentHandler:
             return False
 
 # -------------------- MAIN APPLICATION -------------------- #
+SEGMENT_JOB = "segment_selection"
+
+@st.cache_resource
+def get_segment_handler() -> SegmentHandler:
+    # Streamlit reruns the script on every interaction; build the Sheets and
+    # SMTP clients once per server process instead of once per rerun.
+    return SegmentHandler(Config())
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    # Confirming a segment runs off the request thread, in one worker per server process
+    handler = get_segment_handler()
+    queue = JobQueue()
+    JobWorker(queue, {
+        SEGMENT_JOB: lambda payload: handler.update_segment_and_send_email(payload["email"], payload["segment"])
+    }).start()
+    return queue
+
+def show_job_status(ui: UIManager, queue: JobQueue) -> bool:
+    """
+    Renders the submitted job's state; returns True while it is still pending.
+    """
+    submitted = st.session_state.get("segment_job")
+    if not submitted:
+        return False
+    job = queue.status(submitted["id"])
+    if not job:
+        return False
+    if job["status"] in ("queued", "running"):
+        st.info(f"⏳ Setting up your **{submitted['segment']}** updates…")
+        return True
+    if job["status"] == "done":
+        ui.display_success(f"You're now subscribed to **{submitted['segment']}** updates. Watch your inbox!")
+    else:
+        ui.display_error("No matching email with 'Pending Segment Selection' found in the sheet.")
+    return False
+
 def main():
+    pending = False
     try:
-        segment_config = SegmentConfig()
-        app_config = AppConfig()
-        ui = UIManager(app_config)
-        handler = SegmentHandler(segment_config)
+        config = Config()
+        ui = UIManager(config)
+        queue = get_job_queue()
 
         # Get email from query params
         query_params = st.query_params
@@ -145,19 +165,28 @@ def main():
             ui.display_error("Invalid email format in URL.")
             st.stop()
 
-        selected_segment = st.radio("Select your interest:", app_config.segments)
+        selected_segment = st.radio("Select your interest:", config.segments)
 
         if st.button("✅ Confirm Selection"):
-            success = handler.update_segment_and_send_email(email, selected_segment)
-            if success:
-                ui.display_success(f"You're now subscribed to **{selected_segment}** updates. Watch your inbox!")
-            else:
-                ui.display_error("No matching email with 'Pending Segment Selection' found in the sheet.")
+            # Repeat clicks or refreshes for the same email and segment map to the same job
+            job_id = queue.submit(
+                SEGMENT_JOB,
+                {"email": email, "segment": selected_segment},
+                dedupe_key=f"{email.lower()}|{selected_segment}"
+            )
+            st.session_state["segment_job"] = {"id": job_id, "segment": selected_segment}
+
+        pending = show_job_status(ui, queue)
 
     except Exception as e:
         logger.critical(f"Application failed: {e}")
         st.error(f"An unexpected error occurred: {e}")
 
+    # Poll outside the try block: st.rerun works by raising an exception
+    if pending:
+        time.sleep(1)
+        st.rerun()
+
 # -------------------- RUN -------------------- #
 if __name__ == "__main__":
     main()
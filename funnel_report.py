@@ -0,0 +1,56 @@
+import json
+import logging
+import argparse
+
+from dcg_core.config import load_campaigns
+from dcg_core.funnel import campaign_key, get_funnel
+from dcg_core.logging_setup import setup_logging
+from dcg_core.profiling import run_profiled
+from dcg_core.sheets import SheetClient
+
+# -------------------- LOGGING SETUP -------------------- #
+setup_logging("email_campaign.log")
+logger = logging.getLogger(__name__)
+
+# -------------------- REPORT -------------------- #
+def print_report(report: dict):
+    print(f"Contacts: {report['contacts']}  (updated {report['updated_at'] or 'never'})")
+    print(f"Pending segment selection: {report['pending_selection']}")
+    print(f"In CTA Loop: {report['cta_loop']}")
+    for segment, stats in sorted(report["segments"].items()):
+        print(f"\n{segment}: {stats['total']}")
+        for step, count in sorted(stats["steps"].items()):
+            print(f"  {step:<20}{count:>8}")
+
+# -------------------- MAIN FUNCTION -------------------- #
+def main():
+    parser = argparse.ArgumentParser(description="Campaign funnel counts per segment and step")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--rebuild", action="store_true", help="recount from the sheet before reporting")
+    parser.add_argument("--campaign", help="only report this campaign (default: all campaigns)")
+    args = parser.parse_args()
+
+    configs = load_campaigns()
+    if args.campaign:
+        configs = [c for c in configs if c.campaign_name == args.campaign]
+        if not configs:
+            raise SystemExit(f"No campaign named '{args.campaign}' in config.yaml")
+
+    funnel = get_funnel()
+    keys = []
+    for config in configs:
+        key = campaign_key(config)
+        if key in keys:
+            continue  # campaigns sharing a sheet share counters
+        keys.append(key)
+        if args.rebuild or not funnel.is_seeded(key):
+            funnel.rebuild(key, SheetClient(config).get_all_records())
+
+    report = funnel.report(keys)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+
+if __name__ == "__main__":
+    run_profiled("funnel_report", main)
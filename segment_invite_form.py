@@ -1,85 +1,37 @@
 import streamlit as st
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime
-import smtplib
-from email.message import EmailMessage
-import os
-import re
-
-# -------------------- CONFIG -------------------- #
-CONFIG = {
-    "sheet_name": "dcg_contacts",
-    "worksheet_name": "Sheet1",
-    "segments": [
-        "Business Financing",
-        "Credit Building",
-        "Financial Education",
-        "Referral & Partnership Opportunities"
-    ],
-    "sender_email": "dcgcapital3@gmail.com",             # ✅ Your Gmail
-    "app_password": "fykn tdfm qafy rqks", 
-    "base_url": "https://yourdomain.com/select"          # ✅ Replace with your actual URL
-}
+
+from dcg_core.config import Config
+from dcg_core.funnel import PENDING_SEGMENT, PENDING_STEP, campaign_key, get_funnel
+from dcg_core.importer import import_contacts, read_csv
+from dcg_core.mailer import EmailSender
+from dcg_core.outbox import get_outbox
+from dcg_core.sheets import SheetClient
+from dcg_core.tracking import LinkTracker
+from dcg_core.validation import is_valid_email
+from dcg_core.welcome import build_welcome_email
 
 # -------------------- AUTH -------------------- #
 @st.cache_resource
-def get_gsheets_client():
-    try:
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds_path = os.path.abspath("credentials.json")
-        creds = ServiceAccountCredentials.from_json_keyfile_name(creds_path, scope)
-        return gspread.authorize(creds)
-    except Exception as e:
-        st.error(f"Failed to connect to Google Sheets: {e}")
+def get_sheet_client():
+    sheet_client = SheetClient(Config())
+    if not sheet_client.sheet:
+        st.error("Failed to connect to Google Sheets.")
         return None
+    return sheet_client
 
-# -------------------- VALIDATION -------------------- #
-def is_valid_email(email: str) -> bool:
-    pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-    return bool(re.match(pattern, email))
+@st.cache_resource
+def get_email_sender() -> EmailSender:
+    return EmailSender(Config())
 
 # -------------------- EMAIL FUNCTION -------------------- #
 def send_segment_invite(name, email):
     try:
-        segment_links = "\n".join([
-            f"📈 Business Financing: {CONFIG['base_url']}?email={email}&segment=Business+Financing",
-            f"💳 Credit Building: {CONFIG['base_url']}?email={email}&segment=Credit+Building",
-            f"📚 Financial Education: {CONFIG['base_url']}?email={email}&segment=Financial+Education",
-            f"🤝 Referral Opportunities: {CONFIG['base_url']}?email={email}&segment=Referral+Partnership"
-        ])
-
-        body = f"""Hi {name},
-
-Thanks for connecting with us!
-
-We help ambitious individuals and business owners with:
-
-👉 Business Financing  
-👉 Credit Building  
-👉 Financial Education  
-👉 Referral & Partnership Opportunities
-
-Let us know what you’d like to learn more about. Just click one:
-
-{segment_links}
-
-Once you click, we’ll make sure you only receive what’s most relevant to you.
-
-Best regards,  
-Doriscar Capital Group
-"""
-
-        msg = EmailMessage()
-        msg.set_content(body)
-        msg['Subject'] = "Welcome to Doriscar Capital Group!"
-        msg['From'] = CONFIG['sender_email']
-        msg['To'] = email
-
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-            smtp.login(CONFIG['sender_email'], CONFIG['app_password'])
-            smtp.send_message(msg)
+        subject, body = build_welcome_email(name, email, LinkTracker(Config()))
 
+        if not get_email_sender().send_email(subject, body, email):
+            st.error("❌ Failed to send welcome email: no sender account could deliver it.")
+            return False
         return True
     except Exception as e:
         st.error(f"❌ Failed to send welcome email: {e}")
@@ -107,24 +59,60 @@ def main():
 
         if sent:
             # Save to Google Sheets
-            client = get_gsheets_client()
-            if client:
+            sheet_client = get_sheet_client()
+            if sheet_client:
                 try:
-                    sheet = client.open(CONFIG["sheet_name"]).worksheet(CONFIG["worksheet_name"])
                     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    sheet.append_row([
+                    sheet_client.append_rows([[
                         name.strip(),
                         email.strip().lower(),
                         "Pending Segment Selection",  # Segment not yet selected
                         "", "",  # Last_Email_Sent, Next_Step_Date
                         timestamp,
                         ""       # Notes
-                    ])
+                    ]])
+                    get_funnel().record(campaign_key(sheet_client.config), None, (PENDING_SEGMENT, PENDING_STEP))
                     st.success("✅ Email sent and data saved to Google Sheets.")
                 except Exception as e:
                     st.error(f"Failed to save to Google Sheets: {e}")
             else:
                 st.error("Could not connect to Google Sheets.")
 
+    bulk_import_section()
+
+# -------------------- BULK IMPORT -------------------- #
+def bulk_import_section():
+    st.markdown("---")
+    st.subheader("📥 Bulk Import from CSV")
+    st.caption("CSV needs an Email column; Name and Notes are optional. Welcome emails are queued and sent by the scheduler.")
+
+    uploaded = st.file_uploader("Contacts CSV", type=["csv"])
+    if not uploaded:
+        return
+
+    try:
+        contacts = read_csv(uploaded.getvalue().decode("utf-8-sig"))
+    except Exception as e:
+        st.error(f"❌ Could not read CSV: {e}")
+        return
+
+    queue_welcome = st.checkbox("Queue welcome emails", value=True)
+    if st.button(f"Import {len(contacts)} contacts"):
+        sheet_client = get_sheet_client()
+        if not sheet_client:
+            st.error("Could not connect to Google Sheets.")
+            return
+        try:
+            summary = import_contacts(sheet_client, contacts, outbox=get_outbox() if queue_welcome else None)
+        except Exception as e:
+            st.error(f"❌ Bulk import failed: {e}")
+            return
+        if "error" in summary:
+            st.error(f"❌ Bulk import stopped partway: {summary['error']}. Re-run the import to add the rest.")
+        st.success(f"✅ Added {summary['added']} contacts and queued {summary['queued']} welcome emails.")
+        if summary["duplicates"] or summary["archived"] or summary["invalid"]:
+            st.info(f"Skipped {summary['duplicates']} duplicates, {summary['archived']} archived contacts "
+                    f"and {summary['invalid']} invalid emails.")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,159 +1,26 @@
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime, timedelta
-import json
-import smtplib
-from email.message import EmailMessage
-import os
-import base64
 import logging
-import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
-import yaml
-from tenacity import retry, stop_after_attempt, wait_exponential
-
-# -------------------- CONFIGURATION -------------------- #
-class Config:
-    def __init__(self):
-        config_path = os.getenv("CONFIG_PATH", "config.yaml")
-        with open(config_path, "r", encoding="utf-8") as f:
-            cfg = yaml.safe_load(f)
-        
-        self.sender_email = cfg["email"]["sender_email"]
-        self.app_password = cfg["email"]["app_password"]
-        self.email_sequence_folder = cfg["email"]["sequence_folder"]
-        self.sheet_name = cfg["sheets"]["name"]
-        self.worksheet_name = cfg["sheets"]["worksheet"]
-        self.retry_attempts = cfg.get("email", {}).get("retry_attempts", 3)
-        self.retry_delay = cfg.get("email", {}).get("retry_delay", 5)
+
+from dcg_core.config import Config, load_campaigns, load_config
+from dcg_core.dates import parse_date
+from dcg_core.funnel import CTA_LOOP, PENDING_SEGMENT, campaign_key, contact_state, get_funnel
+from dcg_core.locks import row_lock
+from dcg_core.logging_setup import setup_logging
+from dcg_core.mailer import EmailSender
+from dcg_core.outbox import get_outbox
+from dcg_core.profiling import run_profiled
+from dcg_core.sender_pool import SenderPool, distinct_remaining
+from dcg_core.sequences import EmailSequenceManager
+from dcg_core.sheets import SheetClient
+from dcg_core.tracking import LinkTracker
 
 # -------------------- LOGGING SETUP -------------------- #
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler("email_campaign.log"),
-        logging.StreamHandler()
-    ]
-)
+setup_logging("email_campaign.log")
 logger = logging.getLogger(__name__)
 
-# -------------------- EMAIL VALIDATION -------------------- #
-def is_valid_email(email: str) -> bool:
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
-
-# -------------------- CREDENTIALS MANAGER -------------------- #
-def setup_credentials() -> str:
-    try:
-        encoded = os.getenv("GOOGLE_CREDENTIALS_BASE64")
-        if not encoded:
-            raise ValueError("GOOGLE_CREDENTIALS_BASE64 environment variable not found")
-        
-        creds_path = os.path.abspath("credentials.json")
-        with open(creds_path, "wb") as f:
-            f.write(base64.b64decode(encoded))
-        return creds_path
-    except Exception as e:
-        logger.error(f"Failed to setup credentials: {e}")
-        raise
-
-# -------------------- GOOGLE SHEETS CLIENT -------------------- #
-class SheetClient:
-    def __init__(self, config: Config):
-        self.scope = [
-            "https://spreadsheets.google.com/feeds",
-            "https://www.googleapis.com/auth/drive"
-        ]
-        self.config = config
-        self.client = self._initialize_client()
-        self.sheet = self._get_worksheet()
-
-    def _initialize_client(self):
-        creds_path = setup_credentials()
-        creds = ServiceAccountCredentials.from_json_keyfile_name(creds_path, self.scope)
-        return gspread.authorize(creds)
-
-    def _get_worksheet(self):
-        return self.client.open(self.config.sheet_name).worksheet(self.config.worksheet_name)
-
-    def get_all_records(self) -> List[Dict]:
-        return self.sheet.get_all_records()
-
-    def update_cell(self, row: int, col: int, value: str):
-        try:
-            self.sheet.update_cell(row, col, value)
-        except Exception as e:
-            logger.error(f"Failed to update cell ({row}, {col}): {e}")
-
-# -------------------- EMAIL SENDER -------------------- #
-class EmailSender:
-    def __init__(self, config: Config):
-        self.config = config
-
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry_error_callback=lambda retry_state: False
-    )
-    def send_email(self, subject: str, body: str, recipient_email: str) -> bool:
-        if not is_valid_email(recipient_email):
-            logger.warning(f"Invalid email address: {recipient_email}")
-            return False
-
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = self.config.sender_email
-        msg["To"] = recipient_email
-        msg.set_content(body)
-
-        try:
-            with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-                smtp.login(self.config.sender_email, self.config.app_password)
-                smtp.send_message(msg)
-            logger.info(f"Successfully sent email to {recipient_email}: {subject}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to send email to {recipient_email}: {e}")
-            return False
-
-# -------------------- EMAIL SEQUENCE MANAGER -------------------- #
-class EmailSequenceManager:
-    def __init__(self, config: Config):
-        self.config = config
-        self.cta_message = """Hi {name},
-
-We noticed you haven't scheduled your free strategy call yet.
-
-We're here to help you move forward with funding that fits your vision.
-
-📅 Book your call now: https://calendly.com/dcgcapital3/30min
-
-Looking forward to helping you grow,  
-Doriscar Capital Group
-"""
-
-    def load_sequence(self, segment_name: str) -> List[Dict]:
-        filename = os.path.join(
-            self.config.email_sequence_folder,
-            f"{segment_name.strip().lower().replace(' ', '_')}.json"
-        )
-        try:
-            if not os.path.exists(filename):
-                logger.warning(f"No sequence found for segment: {segment_name}")
-                return []
-            with open(filename, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load sequence {filename}: {e}")
-            return []
-
-    def get_cta_message(self, name: str) -> tuple:
-        return (
-            "👋 Still Thinking It Over? Let's Talk",
-            self.cta_message.replace("{name}", name if name else "there")
-        )
-
 # -------------------- MAIN CAMPAIGN MANAGER -------------------- #
 class CampaignManager:
     def __init__(self, config: Config):
@@ -161,45 +28,70 @@ class CampaignManager:
         self.sheet_client = SheetClient(config)
         self.email_sender = EmailSender(config)
         self.sequence_manager = EmailSequenceManager(config)
-        self.today = datetime.now().strftime("%Y-%m-%d")
+        self.link_tracker = LinkTracker(config)
+        self.today_date = datetime.now().date()
+        self.today = self.today_date.strftime("%Y-%m-%d")
 
     def process_contacts(self):
-        rows = self.sheet_client.get_all_records()
-        
+        CampaignScheduler([self], workers=1, send_budget=self.config.send_budget).run()
+
+    def collect_due(self) -> List[tuple]:
+        return self._collect_due(self.sheet_client.get_all_records())
+
+    def _collect_due(self, rows: List[Dict]) -> List[tuple]:
+        due = []
         for idx, row in enumerate(rows):
-            try:
-                self._process_contact(idx, row)
-            except Exception as e:
-                logger.error(f"Error processing contact at row {idx + 2}: {e}")
+            raw_date = row.get("Next_Step_Date", "")
+            if str(raw_date).strip() == "" or not self._sendable(row):
+                continue
+            due_date = parse_date(raw_date)
+            if due_date is None:
+                logger.warning(f"Unrecognized Next_Step_Date '{raw_date}' at row {idx + 2}")
+                continue
+            if due_date <= self.today_date:
+                due.append((due_date, idx, row))
+        due.sort(key=lambda item: (item[0], item[1]))
+        return due
+
+    def _sendable(self, row: Dict) -> bool:
+        """
+        False for rows the run would never send to: incomplete, pending a segment,
+        parked in the CTA Loop, or in a segment without a sequence.
+        """
+        email = str(row.get("Email", "")).strip()
+        segment = str(row.get("Segment", "")).strip()
+        if not email or not segment or segment == PENDING_SEGMENT:
+            return False
+        if str(row.get("Last_Email_Sent", "")).strip() == CTA_LOOP:
+            return False
+        return bool(self.sequence_manager.load_sequence(segment))
 
-    def _process_contact(self, idx: int, row: Dict):
+    def _process_contact(self, idx: int, row: Dict) -> bool:
         email = row.get("Email", "").strip()
         segment = row.get("Segment", "").strip()
         name = row.get("Name", "").strip()
-        next_step_date = row.get("Next_Step_Date", "").strip()
         last_email = row.get("Last_Email_Sent", "").strip()
 
         # Skip invalid or incomplete records
-        if not email or not segment or segment == "Pending Segment Selection":
+        if not self._sendable(row):
             logger.debug(f"Skipping invalid record: {email}, {segment}")
-            return
-        if next_step_date != self.today:
-            return
-        if last_email == "CTA Loop":
-            return
+            return False
 
         sequence = self.sequence_manager.load_sequence(segment)
-        if not sequence:
-            return
 
         # Determine email index
         email_index = self._get_email_index(last_email, sequence)
 
         # Process email or CTA loop
         if email_index < len(sequence):
-            self._send_sequence_email(idx, email, name, sequence, email_index)
+            sent = self._send_sequence_email(idx, email, name, segment, sequence, email_index)
+            next_step = f"Week {email_index + 1}"
         else:
-            self._send_cta_email(idx, email, name)
+            sent = self._send_cta_email(idx, email, name, segment)
+            next_step = CTA_LOOP
+        if sent:
+            get_funnel().record(campaign_key(self.config), contact_state(segment, last_email), contact_state(segment, next_step))
+        return sent
 
     def _get_email_index(self, last_email: str, sequence: List[Dict]) -> int:
         if not last_email:
@@ -212,22 +104,180 @@ class CampaignManager:
                 return 0
         return 0
 
-    def _send_sequence_email(self, idx: int, email: str, name: str, sequence: List[Dict], email_index: int):
+    def _send_sequence_email(self, idx: int, email: str, name: str, segment: str, sequence: List[Dict], email_index: int) -> bool:
         email_data = sequence[email_index]
         subject = email_data["subject"]
         body = email_data["body"].replace("{name}", name if name else "there")
+        body = self.link_tracker.track_links(body, email, segment, f"Week {email_index + 1}")
         
         if self.email_sender.send_email(subject, body, email):
             self.sheet_client.update_cell(idx + 2, 4, f"Week {email_index + 1}")
             next_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
             self.sheet_client.update_cell(idx + 2, 5, next_date)
+            return True
+        return False
 
-    def _send_cta_email(self, idx: int, email: str, name: str):
+    def _send_cta_email(self, idx: int, email: str, name: str, segment: str) -> bool:
         subject, body = self.sequence_manager.get_cta_message(name)
+        body = self.link_tracker.track_links(body, email, segment, CTA_LOOP)
         if self.email_sender.send_email(subject, body, email):
-            self.sheet_client.update_cell(idx + 2, 4, "CTA Loop")
+            self.sheet_client.update_cell(idx + 2, 4, CTA_LOOP)
             next_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
             self.sheet_client.update_cell(idx + 2, 5, next_date)
+            return True
+        return False
+
+# -------------------- CAMPAIGN SCHEDULER -------------------- #
+class CampaignScheduler:
+    """
+    Runs one or more campaigns from a single process.
+
+    Due contacts are handed out round-robin across campaigns, oldest-overdue
+    first within each, so a large campaign can't starve a small one. Worker
+    threads send them concurrently against the shared sender accounts,
+    Google session and Sheets quota, within one overall send budget.
+    """
+
+    def __init__(self, managers: List[CampaignManager], workers: int = 4, send_budget: Optional[int] = None):
+        self.managers = managers
+        self.workers = max(int(workers), 1)
+        self.send_budget = send_budget
+        self.stats = {id(m): {"due": 0, "sent": 0, "deferred": 0, "reserved": 0, "backlog": 0} for m in managers}
+        self._budget = 0
+        self._sent = 0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._next_lock = threading.Lock()
+
+    def run(self):
+        # Row indexes collected below must stay valid until every write has landed;
+        # the lock is shared, so only the archiver (which shifts rows) is kept out
+        with row_lock():
+            self._run()
+
+    def _run(self):
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                dues = list(executor.map(lambda m: m.collect_due(), self.managers))
+            funnel = get_funnel()
+            for manager in self.managers:
+                key = campaign_key(manager.config)
+                if not funnel.is_seeded(key):
+                    # The rows were just fetched, so seeding the counters costs no extra download
+                    funnel.rebuild(key, manager.sheet_client.get_all_records())
+            self._budget = distinct_remaining([m.email_sender.pool for m in self.managers])
+            if self.send_budget is not None:
+                self._budget = min(self._budget, int(self.send_budget))
+
+            # Queued one-off emails (e.g. welcome emails from bulk imports) go first,
+            # but up to half the budget stays reserved for due contacts. Only sendable
+            # rows are collected, so parked CTA Loop contacts don't hold budget back.
+            total_due = sum(len(due) for due in dues)
+            outbox_limit = self._budget - min(total_due, self._budget // 2)
+            self._sent += get_outbox().drain(self._outbox_sender(), limit=outbox_limit)
+
+            work = self._fair_work(dues)
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for future in [executor.submit(self._worker, work) for _ in range(self.workers)]:
+                    future.result()
+        finally:
+            for manager in self.managers:
+                manager.sheet_client.flush()
+                manager.email_sender.close()
+
+        for manager in self.managers:
+            stats = self.stats[id(manager)]
+            logger.info(f"Campaign run complete [{manager.config.campaign_name}]: {stats['due']} due, "
+                        f"{stats['sent']} sent, {stats['deferred']} deferred to the next run")
+
+    def _outbox_sender(self) -> EmailSender:
+        # Queued emails aren't tied to a campaign, so any account with budget may send them
+        senders = {s["sender_email"]: s for m in self.managers for s in m.config.senders}
+        return EmailSender(self.managers[0].config, SenderPool(list(senders.values())))
+
+    def _fair_work(self, dues: List[List[tuple]]):
+        queues = []
+        for manager, due in zip(self.managers, dues):
+            self.stats[id(manager)]["due"] = len(due)
+            queues.append((manager, iter(due)))
+
+        # Round-robin: one contact per campaign per pass
+        while queues:
+            for entry in list(queues):
+                manager, due = entry
+                item = next(due, None)
+                if item is None:
+                    queues.remove(entry)
+                    continue
+                overdue = item[0] < manager.today_date
+                if not self._reserve_campaign(manager, overdue):
+                    self.stats[id(manager)]["deferred"] += 1
+                    continue
+                if not self._reserve():
+                    self._release_campaign(manager, overdue)
+                    self.stats[id(manager)]["deferred"] += 1
+                    continue
+                yield manager, item, overdue
+
+    def _reserve_campaign(self, manager: CampaignManager, overdue: bool) -> bool:
+        stats = self.stats[id(manager)]
+        cap = manager.config.campaign_budget
+        with self._cond:
+            if cap is not None and stats["reserved"] >= int(cap):
+                return False
+            if overdue and stats["backlog"] >= manager.config.backlog_per_run:
+                return False
+            if manager.email_sender.pool.remaining <= 0:
+                return False
+            stats["reserved"] += 1
+            if overdue:
+                stats["backlog"] += 1
+            return True
+
+    def _release_campaign(self, manager: CampaignManager, overdue: bool):
+        stats = self.stats[id(manager)]
+        with self._cond:
+            stats["reserved"] -= 1
+            if overdue:
+                stats["backlog"] -= 1
+
+    def _reserve(self) -> bool:
+        # Wait for in-flight sends to settle before giving up on the budget,
+        # since a skipped or failed send hands its slot back.
+        with self._cond:
+            while self._sent + self._in_flight >= self._budget:
+                if self._in_flight == 0:
+                    return False
+                self._cond.wait()
+            self._in_flight += 1
+            return True
+
+    def _worker(self, work):
+        while True:
+            with self._next_lock:
+                item = next(work, None)
+            if item is None:
+                return
+            manager, (due_date, idx, row), overdue = item
+            sent = False
+            try:
+                sent = manager._process_contact(idx, row)
+            except Exception as e:
+                logger.error(f"Error processing contact at row {idx + 2} [{manager.config.campaign_name}]: {e}")
+            if not sent:
+                self._release_campaign(manager, overdue)
+            with self._cond:
+                self._in_flight -= 1
+                if sent:
+                    self._sent += 1
+                    self.stats[id(manager)]["sent"] += 1
+                self._cond.notify_all()
+
+# -------------------- MULTI-CAMPAIGN ENTRY POINT -------------------- #
+def run_campaigns():
+    email_cfg = load_config().get("email", {})
+    managers = [CampaignManager(config) for config in load_campaigns()]
+    CampaignScheduler(managers, workers=email_cfg.get("workers", 4), send_budget=email_cfg.get("send_budget")).run()
 
 # -------------------- MANUAL TRIGGER: send_segment_email() -------------------- #
 def send_segment_email(email: str, segment: str) -> bool:
@@ -245,6 +295,7 @@ def send_segment_email(email: str, segment: str) -> bool:
         for idx, row in enumerate(records):
             if row["Email"].strip().lower() == email.strip().lower():
                 name = row.get("Name", "there")
+                before = contact_state(row.get("Segment", ""), row.get("Last_Email_Sent", ""))
                 break
         else:
             logger.warning(f"Email {email} not found in sheet during segment email send.")
@@ -258,15 +309,31 @@ def send_segment_email(email: str, segment: str) -> bool:
         first_email = sequence[0]
         subject = first_email["subject"]
         body = first_email["body"].replace("{name}", name)
+        body = LinkTracker(config).track_links(body, email, segment, "Week 1")
 
-        if email_sender.send_email(subject, body, email):
-            row_index = idx + 2
-            sheet_client.update_cell(row_index, 4, "Week 1")
+        sent = email_sender.send_email(subject, body, email)
+        email_sender.close()
+        if sent:
             next_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
-            sheet_client.update_cell(row_index, 5, next_date)
+            # Look the row up again under the lock: the archiver may have shifted it while we sent
+            with row_lock():
+                records = sheet_client.get_all_records(verify=True)
+                row_index = next((i for i, r in enumerate(records, start=2)
+                                  if str(r.get("Email", "")).strip().lower() == email.strip().lower()), None)
+                if row_index is None:
+                    # Sent already, so don't report failure and invite a resend
+                    logger.warning(f"Email {email} left the sheet before its Week 1 update could be written.")
+                    return True
+                sheet_client.update_cell(row_index, 4, "Week 1")
+                sheet_client.update_cell(row_index, 5, next_date)
+                sheet_client.flush()
+            get_funnel().record(campaign_key(config), before, before and (before[0], "Week 1"))
             logger.info(f"Segment email successfully sent and logged for {email}")
             return True
         return False
     except Exception as e:
         logger.error(f"Failed in send_segment_email for {email}: {e}")
         return False
+
+if __name__ == "__main__":
+    run_profiled("send_scheduled_emails", run_campaigns)